@@ -11,12 +11,12 @@ __email__ = "contact@taxformparser.com"
 
 from .ocr_parser import OCRParser
 from .nlp_processor import NLPProcessor
-from .db_handler import DatabaseHandler
+from .db_handler import DBHandler
 from .efiling_integration import EFilingIntegration
 
 __all__ = [
     "OCRParser",
     "NLPProcessor", 
-    "DatabaseHandler",
+    "DBHandler",
     "EFilingIntegration"
 ]
\ No newline at end of file
@@ -14,6 +14,19 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INSERT_FORM_QUERY = """
+INSERT INTO tax_forms (
+    form_id, form_type, taxpayer_name, ssn, filing_status,
+    tax_year, wages, federal_tax_withheld, address, city,
+    state, zip_code, raw_text
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_LOG_QUERY = """
+INSERT INTO processing_log (form_id, processing_status, error_message)
+VALUES (%s, %s, %s)
+"""
+
 
 class DBHandler:
     """
@@ -35,6 +48,7 @@ class DBHandler:
         self.password = password
         self.database = database
         self.connection = None
+        self._tables_ready = False
         
     def connect(self):
         """
@@ -54,11 +68,46 @@ class DBHandler:
             if self.connection.is_connected():
                 logger.info(f"Successfully connected to MySQL database: {self.database}")
                 return True
+            
+            # Never keep a connection that did not come up
+            self.connection = None
+            return False
                 
         except Error as e:
             logger.error(f"Error connecting to MySQL database: {e}")
+            self.connection = None
             return False
             
+    def ensure_connection(self):
+        """
+        Reuse the open connection, or connect to MySQL database if there is none
+        
+        A connection dropped since its last use (server wait_timeout, network
+        failure) is re-established before it is reused.
+        
+        Returns:
+            bool: True if a connection is available, False otherwise
+        """
+        if self.connection is not None:
+            try:
+                self.connection.ping(reconnect=True, attempts=1, delay=0)
+                return True
+            except Error as e:
+                logger.warning(f"Lost MySQL connection, reconnecting: {e}")
+                self.close_connection()
+        return self.connect()
+    
+    def ensure_tables(self):
+        """
+        Create the tables on first use only; later calls skip the DDL round trip
+        
+        Returns:
+            bool: True if tables are available, False otherwise
+        """
+        if not self._tables_ready:
+            self._tables_ready = self.create_tables()
+        return self._tables_ready
+    
     def create_tables(self):
         """
         Create necessary tables for storing tax form data
@@ -130,31 +179,7 @@ class DBHandler:
         try:
             cursor = self.connection.cursor()
             
-            insert_query = """
-            INSERT INTO tax_forms (
-                form_id, form_type, taxpayer_name, ssn, filing_status,
-                tax_year, wages, federal_tax_withheld, address, city,
-                state, zip_code, raw_text
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            values = (
-                form_data.get('form_id'),
-                form_data.get('form_type'),
-                form_data.get('name'),
-                form_data.get('ssn'),
-                form_data.get('filing_status'),
-                form_data.get('tax_year'),
-                form_data.get('wages'),
-                form_data.get('federal_tax_withheld'),
-                form_data.get('address'),
-                form_data.get('city'),
-                form_data.get('state'),
-                form_data.get('zip_code'),
-                form_data.get('raw_text')
-            )
-            
-            cursor.execute(insert_query, values)
+            cursor.execute(INSERT_FORM_QUERY, self._form_values(form_data))
             self.connection.commit()
             
             record_id = cursor.lastrowid
@@ -169,6 +194,69 @@ class DBHandler:
             if cursor:
                 cursor.close()
     
+    def insert_forms_batch(self, forms_data, page_size=500):
+        """
+        Insert several tax forms in a single transaction using executemany
+        
+        Args:
+            forms_data (list): Dictionaries containing form data
+            page_size (int): Number of rows sent per executemany call
+            
+        Returns:
+            int: Number of inserted records if successful, None otherwise
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            
+            inserted = 0
+            for start in range(0, len(forms_data), page_size):
+                rows = [self._form_values(form_data)
+                        for form_data in forms_data[start:start + page_size]]
+                cursor.executemany(INSERT_FORM_QUERY, rows)
+                inserted += len(rows)
+            
+            # One commit for the whole batch
+            self.connection.commit()
+            
+            logger.info(f"Successfully inserted {inserted} forms")
+            return inserted
+            
+        except Error as e:
+            logger.error(f"Error inserting form data batch: {e}")
+            self.connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+    
+    @staticmethod
+    def _form_values(form_data):
+        """
+        Build the tax_forms row values for a form
+        
+        Args:
+            form_data (dict): Dictionary containing form data
+            
+        Returns:
+            tuple: Values in INSERT_FORM_QUERY column order
+        """
+        return (
+            form_data.get('form_id'),
+            form_data.get('form_type'),
+            form_data.get('name'),
+            form_data.get('ssn'),
+            form_data.get('filing_status'),
+            form_data.get('tax_year'),
+            form_data.get('wages'),
+            form_data.get('federal_tax_withheld'),
+            form_data.get('address'),
+            form_data.get('city'),
+            form_data.get('state'),
+            form_data.get('zip_code'),
+            form_data.get('raw_text')
+        )
+    
     def get_form_by_id(self, form_id):
         """
         Retrieve tax form data by form ID
@@ -328,12 +416,7 @@ class DBHandler:
         try:
             cursor = self.connection.cursor()
             
-            insert_query = """
-            INSERT INTO processing_log (form_id, processing_status, error_message)
-            VALUES (%s, %s, %s)
-            """
-            
-            cursor.execute(insert_query, (form_id, status, error_message))
+            cursor.execute(INSERT_LOG_QUERY, (form_id, status, error_message))
             self.connection.commit()
             
             logger.info(f"Logged processing status for {form_id}: {status}")
@@ -346,11 +429,39 @@ class DBHandler:
             if cursor:
                 cursor.close()
     
+    def log_processing_batch(self, entries):
+        """
+        Log processing status for several forms in one executemany
+        
+        Args:
+            entries (list): (form_id, status, error_message) tuples
+            
+        Returns:
+            bool: True if logging successful, False otherwise
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.executemany(INSERT_LOG_QUERY, entries)
+            self.connection.commit()
+            
+            logger.info(f"Logged processing status for {len(entries)} forms")
+            return True
+            
+        except Error as e:
+            logger.error(f"Error logging processing status batch: {e}")
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+    
     def close_connection(self):
         """Close database connection"""
         if self.connection and self.connection.is_connected():
             self.connection.close()
             logger.info("Database connection closed")
+        self.connection = None
 
 
 if __name__ == "__main__":
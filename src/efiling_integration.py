@@ -6,14 +6,23 @@ and checking submission status.
 """
 
 import requests
-import json
+import re
+import uuid
 import logging
+import threading
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Field tables used by validate_form_data
+REQUIRED_FIELDS = ('form_type', 'taxpayer_name', 'ssn', 'tax_year')
+MONETARY_FIELDS = ('wages', 'federal_tax_withheld', 'tax_due', 'refund')
+
+# Nine digits with dashes allowed anywhere, matched without copying the SSN
+_SSN_RE = re.compile(r'\A-*(?:\d-*){9}\Z')
+
 
 class EFilingIntegration:
     """
@@ -30,14 +39,31 @@ class EFilingIntegration:
         """
         self.api_endpoint = api_endpoint
         self.api_key = api_key
-        self.session = requests.Session()
         
-        # Set default headers
-        if api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            })
+        # requests.Session is not thread-safe, and forms are submitted from
+        # several threads at once, so each thread gets its own session
+        self._local = threading.local()
+    
+    @property
+    def session(self):
+        """
+        HTTP session for the calling thread, created on first use
+        
+        Returns:
+            requests.Session: Session with the default headers set
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            
+            # Set default headers
+            if self.api_key:
+                session.headers.update({
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Content-Type': 'application/json'
+                })
+            self._local.session = session
+        return session
     
     def validate_form_data(self, form_data):
         """
@@ -56,16 +82,14 @@ class EFilingIntegration:
         }
         
         # Required fields check
-        required_fields = ['form_type', 'taxpayer_name', 'ssn', 'tax_year']
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if not form_data.get(field):
                 validation_results['errors'].append(f"Missing required field: {field}")
                 validation_results['valid'] = False
         
         # SSN format validation
         if form_data.get('ssn'):
-            ssn = form_data['ssn'].replace('-', '')
-            if not ssn.isdigit() or len(ssn) != 9:
+            if not _SSN_RE.match(form_data['ssn']):
                 validation_results['errors'].append("Invalid SSN format")
                 validation_results['valid'] = False
         
@@ -73,16 +97,15 @@ class EFilingIntegration:
         if form_data.get('tax_year'):
             try:
                 year = int(form_data['tax_year'])
-                current_year = datetime.now().year
-                if year < 1900 or year > current_year:
+                # Read per call so a long-running instance follows the calendar
+                if year < 1900 or year > datetime.now().year:
                     validation_results['warnings'].append(f"Unusual tax year: {year}")
             except ValueError:
                 validation_results['errors'].append("Invalid tax year format")
                 validation_results['valid'] = False
         
         # Monetary amounts validation
-        monetary_fields = ['wages', 'federal_tax_withheld', 'tax_due', 'refund']
-        for field in monetary_fields:
+        for field in MONETARY_FIELDS:
             if field in form_data and form_data[field] is not None:
                 try:
                     amount = float(form_data[field])
@@ -104,10 +127,12 @@ class EFilingIntegration:
         Returns:
             dict: Formatted submission data
         """
+        now = datetime.now()
         submission_data = {
-            'submissionId': f"SUB_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            # The random suffix keeps IDs unique for forms submitted in the same second
+            'submissionId': f"SUB_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex}",
             'formType': form_data.get('form_type', '1040'),
-            'taxYear': form_data.get('tax_year', datetime.now().year - 1),
+            'taxYear': form_data.get('tax_year', now.year - 1),
             'taxpayerInfo': {
                 'name': form_data.get('taxpayer_name', ''),
                 'ssn': form_data.get('ssn', ''),
@@ -130,7 +155,7 @@ class EFilingIntegration:
                 'taxDue': form_data.get('tax_due', 0),
                 'refundAmount': form_data.get('refund', 0)
             },
-            'submissionTimestamp': datetime.now().isoformat()
+            'submissionTimestamp': now.isoformat()
         }
         
         return submission_data
@@ -6,51 +6,222 @@ This module orchestrates the processing of tax forms using OCR, NLP, database, a
 
 import os
 import sys
+import time
+import queue
 import logging
+import logging.handlers
+import threading
+import multiprocessing
+from collections import Counter, OrderedDict
+from itertools import islice, repeat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
-# Add src directory to Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from ocr_parser import OCRParser
-from nlp_processor import NLPProcessor
-from db_handler import DBHandler
-from efiling_integration import EFilingIntegration
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('tax_parser.log'),
-        logging.StreamHandler()
-    ]
-)
+if __package__:
+    # Imported as part of the src package (python -m src.main, pool workers)
+    from .ocr_parser import OCRParser
+    from .nlp_processor import NLPProcessor
+    from .db_handler import DBHandler
+    from .efiling_integration import EFilingIntegration
+else:
+    # Run as a plain script: add src directory to Python path
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    
+    from ocr_parser import OCRParser
+    from nlp_processor import NLPProcessor
+    from db_handler import DBHandler
+    from efiling_integration import EFilingIntegration
+
+# Format of the records main() writes to the console and tax_parser.log
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logger = logging.getLogger(__name__)
 
+# Number of form texts sent through spaCy's nlp.pipe at once
+NLP_BATCH_SIZE = 64
+
+# Most writer threads storing analyzed forms; each one owns its database
+# connection, and one is started per DB_BATCH_SIZE forms queued
+STORE_WORKERS = 4
+
+# Analyzed forms a writer thread buffers before one batched insert
+DB_BATCH_SIZE = 500
+
+# Seconds a writer thread holds buffered forms before inserting a partial batch
+DB_FLUSH_INTERVAL = 1.0
+
+# Default concurrent e-filing submissions; the endpoint is network bound and
+# this also caps the request rate against it
+EFILING_WORKERS = 16
+
+# Processing statuses whose forms are submitted for e-filing
+FILEABLE_STATUSES = frozenset(('SUCCESS', 'WARNING'))
+
+# Distinct form texts whose extracted fields and validation are memoized
+EXTRACTION_CACHE_SIZE = 10000
+
+
+class FormAnalyzer:
+    """
+    Form analysis (field extraction, validation, spaCy) without database or e-filing state
+    """
+    
+    def __init__(self, nlp_processor, enable_nlp_analysis=True):
+        """
+        Initialize the form analyzer
+        
+        Args:
+            nlp_processor (NLPProcessor): NLP processor to analyze with
+            enable_nlp_analysis (bool): Run the spaCy entity analysis
+        """
+        self.nlp_processor = nlp_processor
+        self.enable_nlp_analysis = enable_nlp_analysis
+        
+        # Duplicate form texts (resubmissions, test rows) reuse earlier results
+        self._extract_cache = OrderedDict()
+    
+    def clear_cache(self):
+        """Drop all memoized extraction, validation and spaCy results"""
+        self._extract_cache.clear()
+        self.nlp_processor.clear_cache()
+    
+    def analyze_forms(self, forms_data, processed_at=None):
+        """
+        Extract and validate several tax forms, batching the spaCy analysis
+        
+        Args:
+            forms_data (list): Form data dicts with form_id and raw_text
+            processed_at (str): ISO timestamp shared by the batch (optional)
+            
+        Returns:
+            list: (processing result, complete form data) pairs in input order
+            
+        Raises:
+            OSError: If spaCy analysis is enabled and the model is not installed
+        """
+        texts = [form_data.get('raw_text') or '' for form_data in forms_data]
+        # One digest per text serves both the extraction and the spaCy cache
+        keys = [self.nlp_processor.cache_key(text) for text in texts]
+        
+        if self.enable_nlp_analysis:
+            spacy_results = self.nlp_processor.process_texts_with_spacy(texts, batch_size=NLP_BATCH_SIZE,
+                                                                        keys=keys)
+        else:
+            spacy_results = [{} for _ in forms_data]
+        
+        # Forms without text fail in analyze_form, so they get no precomputed key
+        return [self.analyze_form(form_data, spacy_result, processed_at,
+                                  text_key=key if form_data.get('raw_text') else None)
+                for form_data, spacy_result, key in zip(forms_data, spacy_results, keys)]
+    
+    def analyze_form(self, form_data, spacy_results=None, processed_at=None, text_key=None):
+        """
+        Extract and validate a single tax form without touching the database
+        
+        Args:
+            form_data (dict): Form data with form_id and raw_text
+            spacy_results (dict): Precomputed spaCy analysis (optional)
+            processed_at (str): ISO timestamp to record (optional, defaults to now)
+            text_key (bytes): NLPProcessor.cache_key of raw_text, if already
+                computed (optional)
+            
+        Returns:
+            tuple: Processing result and complete form data (None on error)
+            
+        Raises:
+            OSError: If spaCy analysis is enabled and the model is not installed
+        """
+        try:
+            form_id = form_data['form_id']
+            raw_text = form_data['raw_text']
+            
+            logger.info(f"Processing form: {form_id}")
+            
+            # The CSV readers return empty cells as '' rather than NaN; a form
+            # without text is an error, not a valid form with no fields
+            if not isinstance(raw_text, str) or not raw_text.strip():
+                raise ValueError(f"Form {form_id} has no raw_text")
+            
+            # Extract structured data using NLP and validate it, unless this
+            # exact text was seen before
+            key = text_key if text_key is not None else self.nlp_processor.cache_key(raw_text)
+            cached = self._extract_cache.get(key)
+            if cached is not None:
+                self._extract_cache.move_to_end(key)
+            else:
+                cached = _freeze_extraction(*self.nlp_processor.extract_and_validate(raw_text))
+                self._extract_cache[key] = cached
+                if len(self._extract_cache) > EXTRACTION_CACHE_SIZE:
+                    self._extract_cache.popitem(last=False)
+            # Fresh dicts for every form, so results never share mutable state
+            extracted_fields, validation_results = _thaw_extraction(cached)
+            
+            # Process with spaCy for additional analysis unless already batched
+            if spacy_results is None:
+                if self.enable_nlp_analysis:
+                    spacy_results = self.nlp_processor.process_with_spacy(raw_text, key=key)
+                else:
+                    spacy_results = {}
+            
+            # Prepare complete form data
+            complete_form_data = {
+                'form_id': form_id,
+                'raw_text': raw_text,
+                'form_type': '1040',  # Default form type
+                **extracted_fields
+            }
+            
+            # Prepare result
+            result = {
+                'form_id': form_id,
+                'processing_status': 'SUCCESS' if validation_results['valid'] else 'WARNING',
+                'extracted_fields': extracted_fields,
+                'spacy_analysis': spacy_results,
+                'validation': validation_results,
+                'processed_at': processed_at or datetime.now().isoformat()
+            }
+            
+            logger.info(f"Successfully processed form: {form_id}")
+            return result, complete_form_data
+            
+        except OSError:
+            # A missing spaCy model fails the run, not each form in turn
+            raise
+        except Exception as e:
+            logger.error(f"Error processing form {form_data.get('form_id', 'unknown')}: {str(e)}")
+            return _error_result(form_data, e, processed_at), None
+
 
 class TaxFormProcessor:
     """
     Main processor class that coordinates all components
     """
     
-    def __init__(self, db_config=None):
+    def __init__(self, db_config=None, max_workers=None, enable_nlp_analysis=True, efiling_workers=None):
         """
         Initialize the tax form processor
         
         Args:
             db_config (dict): Database configuration (optional)
+            max_workers (int): Worker processes for CSV processing (optional,
+                defaults to MAX_WORKERS or one less than the CPU count)
+            enable_nlp_analysis (bool): Run the spaCy entity analysis; field
+                extraction and validation are regex based and always run
+            efiling_workers (int): Concurrent e-filing submissions (optional,
+                defaults to EFILING_WORKERS)
         """
         try:
+            self.db_config = db_config
+            self.max_workers = max_workers if max_workers else _default_worker_count()
+            self.enable_nlp_analysis = enable_nlp_analysis
+            self.efiling_workers = efiling_workers if efiling_workers else EFILING_WORKERS
+            
             # Initialize components
             self.ocr_parser = OCRParser()
             self.nlp_processor = NLPProcessor()
+            self.analyzer = FormAnalyzer(self.nlp_processor, enable_nlp_analysis)
             
             # Initialize database handler
-            if db_config:
-                self.db_handler = DBHandler(**db_config)
-            else:
-                self.db_handler = DBHandler()
+            self.db_handler = self._create_db_handler()
                 
             # Initialize e-filing integration
             self.efiling = EFilingIntegration()
@@ -61,6 +232,28 @@ class TaxFormProcessor:
             logger.error(f"Error initializing TaxFormProcessor: {str(e)}")
             raise
     
+    def close(self):
+        """Close the processor's database connection"""
+        self.db_handler.close_connection()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def _create_db_handler(self):
+        """
+        Create a database handler from the processor's database configuration
+        
+        Returns:
+            DBHandler: New, unconnected database handler
+        """
+        if self.db_config:
+            return DBHandler(**self.db_config)
+        return DBHandler()
+    
     def process_csv_file(self, csv_path):
         """
         Process tax forms from CSV file
@@ -71,19 +264,108 @@ class TaxFormProcessor:
         Returns:
             list: List of processing results
         """
+        return self._process_csv(csv_path)[0]
+    
+    def _process_csv(self, csv_path):
+        """
+        Process tax forms from CSV file, also returning the complete form data
+        
+        Forms are analyzed (NLP + validation) while writer threads store the
+        already analyzed forms. Writers insert whatever they have buffered after
+        DB_FLUSH_INTERVAL seconds, so database I/O overlaps with NLP work, and
+        one more writer is started for every DB_BATCH_SIZE forms queued, up to
+        STORE_WORKERS, so larger files also overlap database round trips.
+        
+        Args:
+            csv_path (str): Path to CSV file containing tax form data
+            
+        Returns:
+            tuple: List of processing results and, in the same order, the
+                complete form data for each form (None where analysis failed)
+        """
         try:
             logger.info(f"Processing CSV file: {csv_path}")
             
-            # Read tax forms from CSV
-            forms_data = self.ocr_parser.read_csv(csv_path)
-            
             results = []
-            for form_data in forms_data:
-                result = self.process_single_form(form_data)
-                results.append(result)
+            complete_forms = []
+            store_queue = queue.Queue(maxsize=64)
+            writers = []
+            queued = 0
+            
+            def collect(analyzed):
+                nonlocal queued
+                for result, complete_form_data in analyzed:
+                    results.append(result)
+                    complete_forms.append(complete_form_data)
+                    if complete_form_data is not None:
+                        # Writers (and their connections) are started on demand, so a
+                        # small file uses one and a file without valid forms none
+                        if len(writers) < STORE_WORKERS and queued >= len(writers) * DB_BATCH_SIZE:
+                            writer = threading.Thread(target=self._store_worker, args=(store_queue,),
+                                                      daemon=True)
+                            writer.start()
+                            writers.append(writer)
+                        store_queue.put((complete_form_data, result))
+                        queued += 1
+            
+            # One timestamp for the whole CSV instead of a clock read per form
+            processed_at = datetime.now().isoformat()
+            
+            try:
+                forms_iter = None
+                if self.max_workers > 1:
+                    # Read tax forms from CSV
+                    forms_data = self.ocr_parser.read_csv(csv_path)
+                    
+                    # Forms are independent, so spread them across worker processes.
+                    # Starting a worker (package import, spaCy model load) costs more
+                    # than analyzing a few forms, so every worker must get at least
+                    # one full spaCy batch; smaller files are analyzed in this process
+                    workers = min(self.max_workers, len(forms_data) // NLP_BATCH_SIZE)
+                    if workers > 1:
+                        context = _worker_context()
+                        
+                        # Workers send their log records back here, so the parent's
+                        # handlers write them (tax_parser.log included)
+                        log_queue = context.Queue()
+                        log_listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers,
+                                                                      respect_handler_level=True)
+                        log_listener.start()
+                        try:
+                            with ProcessPoolExecutor(max_workers=workers,
+                                                     mp_context=context,
+                                                     initializer=_init_worker,
+                                                     initargs=(self.enable_nlp_analysis, log_queue)) as executor:
+                                # Hand each worker whole batches so spaCy can run them through nlp.pipe
+                                batches = [forms_data[i:i + NLP_BATCH_SIZE]
+                                           for i in range(0, len(forms_data), NLP_BATCH_SIZE)]
+                                for analyzed in executor.map(_analyze_forms_in_worker, batches,
+                                                             repeat(processed_at)):
+                                    collect(analyzed)
+                        finally:
+                            # Workers have exited, so every record they queued is drained
+                            log_listener.stop()
+                    else:
+                        forms_iter = iter(forms_data)
+                else:
+                    # Single process: stream the CSV instead of loading every form first
+                    forms_iter = self.ocr_parser.iter_csv(csv_path)
+                
+                if forms_iter is not None:
+                    while True:
+                        batch = list(islice(forms_iter, NLP_BATCH_SIZE))
+                        if not batch:
+                            break
+                        collect(self.analyzer.analyze_forms(batch, processed_at))
+            finally:
+                # One sentinel per writer thread signals that no more forms are coming
+                for _ in writers:
+                    store_queue.put(None)
+                for writer in writers:
+                    writer.join()
             
             logger.info(f"Processed {len(results)} forms from CSV")
-            return results
+            return results, complete_forms
             
         except Exception as e:
             logger.error(f"Error processing CSV file: {str(e)}")
@@ -99,64 +381,120 @@ class TaxFormProcessor:
         Returns:
             dict: Processing result
         """
+        result, complete_form_data = self.analyzer.analyze_form(form_data)
+        
+        if complete_form_data is not None:
+            try:
+                self._store_form(complete_form_data, result)
+            except Exception as e:
+                logger.error(f"Error processing form {form_data.get('form_id', 'unknown')}: {str(e)}")
+                return _error_result(form_data, e)
+        
+        return result
+    
+    def _store_form(self, complete_form_data, result, db_handler=None):
+        """
+        Store an analyzed form and its processing status in the database
+        
+        Args:
+            complete_form_data (dict): Form data to insert
+            result (dict): Processing result for the form
+            db_handler (DBHandler): Handler to store with (optional, defaults
+                to the processor's own handler)
+        """
+        db_handler = db_handler or self.db_handler
+        form_id = complete_form_data['form_id']
+        
+        # Store in database if connection is available (kept open between forms)
+        if db_handler.ensure_connection():
+            db_handler.ensure_tables()
+            record_id = db_handler.insert_form_data(complete_form_data)
+            
+            # Log processing status
+            if record_id:
+                db_handler.log_processing(form_id, result['processing_status'])
+            else:
+                db_handler.log_processing(form_id, 'ERROR', 'Failed to insert data')
+    
+    def _store_worker(self, store_queue):
+        """
+        Writer thread body: store analyzed forms until the None sentinel arrives
+        
+        Args:
+            store_queue (queue.Queue): Queue of (complete_form_data, result) pairs
+        """
+        # Connections are not shared between threads; each writer keeps its own
+        # open for the whole run
+        db_handler = self._create_db_handler()
+        pending = []
+        deadline = None
+        
+        try:
+            while True:
+                if pending:
+                    try:
+                        item = store_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        # Analysis is slower than storage; insert what has arrived
+                        self._store_forms(pending, db_handler)
+                        pending = []
+                        continue
+                else:
+                    item = store_queue.get()
+                    deadline = time.monotonic() + DB_FLUSH_INTERVAL
+                
+                if item is not None:
+                    pending.append(item)
+                
+                # Flush a full or overdue buffer, and whatever is left once the
+                # sentinel arrives
+                if pending and (item is None or len(pending) >= DB_BATCH_SIZE
+                                or time.monotonic() >= deadline):
+                    self._store_forms(pending, db_handler)
+                    pending = []
+                
+                if item is None:
+                    break
+        finally:
+            db_handler.close_connection()
+    
+    def _store_forms(self, items, db_handler):
+        """
+        Store a batch of analyzed forms with one bulk insert and one bulk log
+        
+        If the bulk insert fails, the forms are inserted one at a time so a
+        single bad row does not lose the rest of the batch.
+        
+        Args:
+            items (list): (complete_form_data, result) pairs
+            db_handler (DBHandler): Handler to store with
+        """
         try:
-            form_id = form_data['form_id']
-            raw_text = form_data['raw_text']
-            
-            logger.info(f"Processing form: {form_id}")
-            
-            # Extract structured data using NLP
-            extracted_fields = self.nlp_processor.extract_fields(raw_text)
-            
-            # Process with spaCy for additional analysis
-            spacy_results = self.nlp_processor.process_with_spacy(raw_text)
-            
-            # Validate extracted data
-            validation_results = self.nlp_processor.validate_extracted_data(extracted_fields)
-            
-            # Prepare complete form data
-            complete_form_data = {
-                'form_id': form_id,
-                'raw_text': raw_text,
-                'form_type': '1040',  # Default form type
-                **extracted_fields
-            }
-            
             # Store in database if connection is available
-            if self.db_handler.connect():
-                self.db_handler.create_tables()
-                record_id = self.db_handler.insert_form_data(complete_form_data)
+            if db_handler.ensure_connection():
+                db_handler.ensure_tables()
+                inserted = db_handler.insert_forms_batch([complete_form_data for complete_form_data, _ in items],
+                                                         page_size=DB_BATCH_SIZE)
                 
                 # Log processing status
-                if record_id:
-                    status = 'SUCCESS' if validation_results['valid'] else 'WARNING'
-                    self.db_handler.log_processing(form_id, status)
+                if inserted is not None:
+                    entries = [(result['form_id'], result['processing_status'], None) for _, result in items]
                 else:
-                    self.db_handler.log_processing(form_id, 'ERROR', 'Failed to insert data')
+                    # One bad row rolls back the whole batch, so retry the forms one
+                    # at a time to keep the valid ones and log only the bad ones
+                    entries = []
+                    for complete_form_data, result in items:
+                        if db_handler.insert_form_data(complete_form_data):
+                            entries.append((result['form_id'], result['processing_status'], None))
+                        else:
+                            entries.append((result['form_id'], 'ERROR', 'Failed to insert data'))
+                db_handler.log_processing_batch(entries)
                 
-                self.db_handler.close_connection()
-            
-            # Prepare result
-            result = {
-                'form_id': form_id,
-                'processing_status': 'SUCCESS' if validation_results['valid'] else 'WARNING',
-                'extracted_fields': extracted_fields,
-                'spacy_analysis': spacy_results,
-                'validation': validation_results,
-                'processed_at': datetime.now().isoformat()
-            }
-            
-            logger.info(f"Successfully processed form: {form_id}")
-            return result
-            
         except Exception as e:
-            logger.error(f"Error processing form {form_data.get('form_id', 'unknown')}: {str(e)}")
-            return {
-                'form_id': form_data.get('form_id', 'unknown'),
-                'processing_status': 'ERROR',
-                'error': str(e),
-                'processed_at': datetime.now().isoformat()
-            }
+            logger.error(f"Error storing batch of {len(items)} forms: {str(e)}")
+            for _, result in items:
+                result['processing_status'] = 'ERROR'
+                result['error'] = str(e)
     
     def submit_for_efiling(self, form_data):
         """
@@ -168,21 +506,36 @@ class TaxFormProcessor:
         Returns:
             dict: E-filing submission result
         """
+        submission_result = self._submit_form(form_data)
+        
         try:
-            logger.info(f"Submitting form {form_data.get('form_id')} for e-filing")
+            # Update database with submission status if applicable
+            if submission_result.get('submission_id'):
+                if self.db_handler.ensure_connection():
+                    self.db_handler.log_processing(*self._submission_log_entry(form_data, submission_result))
             
-            # Submit to e-filing system
-            submission_result = self.efiling.submit_form(form_data)
+        except Exception as e:
+            logger.error(f"Error logging e-filing submission: {str(e)}")
+        
+        return submission_result
+    
+    def _submit_form(self, form_data):
+        """
+        Submit form data to the e-filing system without touching the database
+        
+        Safe to run from several threads at once.
+        
+        Args:
+            form_data (dict): Complete form data
             
-            # Update database with submission status if applicable
-            if hasattr(self, 'db_handler') and submission_result.get('submission_id'):
-                if self.db_handler.connect():
-                    status = 'SUBMITTED' if submission_result['success'] else 'SUBMISSION_FAILED'
-                    error_msg = submission_result.get('error') if not submission_result['success'] else None
-                    self.db_handler.log_processing(form_data['form_id'], status, error_msg)
-                    self.db_handler.close_connection()
+        Returns:
+            dict: E-filing submission result
+        """
+        try:
+            logger.info(f"Submitting form {form_data.get('form_id')} for e-filing")
             
-            return submission_result
+            # Submit to e-filing system
+            return self.efiling.submit_form(form_data)
             
         except Exception as e:
             logger.error(f"Error submitting form for e-filing: {str(e)}")
@@ -192,6 +545,42 @@ class TaxFormProcessor:
                 'message': 'E-filing submission error'
             }
     
+    @staticmethod
+    def _submission_log_entry(form_data, submission_result):
+        """
+        Build the processing log entry for an e-filing submission
+        
+        Args:
+            form_data (dict): Complete form data
+            submission_result (dict): E-filing submission result
+            
+        Returns:
+            tuple: (form_id, status, error_message)
+        """
+        status = 'SUBMITTED' if submission_result['success'] else 'SUBMISSION_FAILED'
+        error_msg = submission_result.get('error') if not submission_result['success'] else None
+        return form_data['form_id'], status, error_msg
+    
+    def _log_submissions(self, forms_to_file, efiling_results):
+        """
+        Log the statuses of several e-filing submissions in one batch
+        
+        Args:
+            forms_to_file (list): Submitted form data
+            efiling_results (list): E-filing submission results, same order
+        """
+        entries = [self._submission_log_entry(form_data, submission_result)
+                   for form_data, submission_result in zip(forms_to_file, efiling_results)
+                   if submission_result.get('submission_id')]
+        if not entries:
+            return
+        
+        try:
+            if self.db_handler.ensure_connection():
+                self.db_handler.log_processing_batch(entries)
+        except Exception as e:
+            logger.error(f"Error logging e-filing submissions: {str(e)}")
+    
     def process_and_file(self, csv_path, submit_for_filing=False):
         """
         Complete processing workflow: parse, extract, validate, store, and optionally e-file
@@ -207,27 +596,35 @@ class TaxFormProcessor:
             logger.info("Starting complete processing workflow")
             
             # Process all forms from CSV
-            processing_results = self.process_csv_file(csv_path)
+            processing_results, complete_forms = self._process_csv(csv_path)
             
-            # Prepare summary
+            # Prepare summary (one pass over the results for all status counts)
             total_forms = len(processing_results)
-            successful_forms = len([r for r in processing_results if r['processing_status'] == 'SUCCESS'])
-            warning_forms = len([r for r in processing_results if r['processing_status'] == 'WARNING'])
-            error_forms = len([r for r in processing_results if r['processing_status'] == 'ERROR'])
+            status_counts = Counter(r['processing_status'] for r in processing_results)
+            successful_forms = status_counts['SUCCESS']
+            warning_forms = status_counts['WARNING']
+            error_forms = status_counts['ERROR']
             
             # E-filing submissions if requested
             efiling_results = []
             if submit_for_filing:
                 logger.info("Starting e-filing submissions")
-                for result in processing_results:
-                    if result['processing_status'] in ['SUCCESS', 'WARNING']:
-                        # Reconstruct form data for e-filing
-                        form_data = {
-                            'form_id': result['form_id'],
-                            **result['extracted_fields']
-                        }
-                        efiling_result = self.submit_for_efiling(form_data)
-                        efiling_results.append(efiling_result)
+                # Reuse the complete form data built during analysis
+                forms_to_file = [
+                    complete_form_data
+                    for result, complete_form_data in zip(processing_results, complete_forms)
+                    if result['processing_status'] in FILEABLE_STATUSES
+                ]
+                
+                # Submissions wait on the network, so overlap them in threads
+                with ThreadPoolExecutor(max_workers=self.efiling_workers) as executor:
+                    efiling_results = list(executor.map(self._submit_form, forms_to_file))
+                
+                # Log submission statuses afterwards over a single connection
+                self._log_submissions(forms_to_file, efiling_results)
+            
+            # Failed submissions are the rest, so one pass covers both counts
+            efiling_successful = sum(1 for r in efiling_results if r.get('success', False))
             
             # Prepare final summary
             summary = {
@@ -241,8 +638,8 @@ class TaxFormProcessor:
                 'processing_results': processing_results,
                 'efiling_summary': {
                     'attempted': len(efiling_results),
-                    'successful': len([r for r in efiling_results if r.get('success', False)]),
-                    'failed': len([r for r in efiling_results if not r.get('success', False)])
+                    'successful': efiling_successful,
+                    'failed': len(efiling_results) - efiling_successful
                 } if submit_for_filing else None,
                 'efiling_results': efiling_results if submit_for_filing else None,
                 'completed_at': datetime.now().isoformat()
@@ -256,58 +653,195 @@ class TaxFormProcessor:
             raise
 
 
+def _error_result(form_data, error, processed_at=None):
+    """
+    Build the processing result for a form that failed
+    
+    Args:
+        form_data (dict): Form data with form_id and raw_text
+        error (Exception): Error raised while processing the form
+        processed_at (str): ISO timestamp to record (optional, defaults to now)
+        
+    Returns:
+        dict: Error processing result
+    """
+    return {
+        'form_id': form_data.get('form_id', 'unknown'),
+        'processing_status': 'ERROR',
+        'error': str(error),
+        'processed_at': processed_at or datetime.now().isoformat()
+    }
+
+
+def _freeze_extraction(extracted_fields, validation_results):
+    """
+    Convert extracted fields and validation results to an immutable cache entry
+    
+    Args:
+        extracted_fields (dict): Extracted field values (strings and floats)
+        validation_results (dict): Validation results with valid, errors and warnings
+        
+    Returns:
+        tuple: (field items, valid, errors, warnings), all tuples or scalars
+    """
+    return (tuple(extracted_fields.items()), validation_results['valid'],
+            tuple(validation_results['errors']), tuple(validation_results['warnings']))
+
+
+def _thaw_extraction(entry):
+    """
+    Rebuild extracted fields and validation results from a cache entry
+    
+    Args:
+        entry (tuple): Cache entry from _freeze_extraction
+        
+    Returns:
+        tuple: New extracted fields dict and validation results dict
+    """
+    field_items, valid, errors, warnings = entry
+    return dict(field_items), {'valid': valid, 'errors': list(errors), 'warnings': list(warnings)}
+
+
+def _default_worker_count():
+    """
+    Number of worker processes to use when none is configured
+    
+    Returns:
+        int: MAX_WORKERS environment value, or one less than the CPU count
+    """
+    env_workers = os.getenv('MAX_WORKERS')
+    if env_workers:
+        return max(1, int(env_workers))
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _worker_context():
+    """
+    Multiprocessing context for the form analysis pool
+    
+    The pool is created while the writer threads are running, and forking a
+    process whose threads may hold database or logging locks can deadlock the
+    child, so workers are started from a fresh process instead.
+    
+    Returns:
+        multiprocessing.context.BaseContext: forkserver context where
+            available, spawn otherwise
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+# FormAnalyzer owned by the current worker process
+_worker_analyzer = None
+
+
+def _init_worker(enable_nlp_analysis=True, log_queue=None):
+    """
+    Build one FormAnalyzer per worker process so models load once per worker
+    
+    Only the NLP components are created; OCR, database and e-filing
+    clients stay in the parent process.
+    
+    Args:
+        enable_nlp_analysis (bool): Run the spaCy entity analysis
+        log_queue (multiprocessing.Queue): Queue the parent's QueueListener
+            reads log records from (optional)
+    """
+    global _worker_analyzer
+    if log_queue is not None:
+        # Records go to the parent instead of the handlers the component
+        # modules install on import; nothing is buffered when the worker exits
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+    _worker_analyzer = FormAnalyzer(NLPProcessor(), enable_nlp_analysis)
+
+
+def _analyze_forms_in_worker(forms_data, processed_at=None):
+    """
+    Analyze a batch of forms inside a worker process
+    
+    Args:
+        forms_data (list): Form data dicts with form_id and raw_text
+        processed_at (str): ISO timestamp shared by the batch (optional)
+        
+    Returns:
+        list: (processing result, complete form data) pairs in input order
+    """
+    return _worker_analyzer.analyze_forms(forms_data, processed_at)
+
+
+def _configure_logging():
+    """
+    Log to the console and, buffered, to tax_parser.log
+    
+    Runs from main() rather than at import, so importing src as a library or
+    in a pool worker leaves the host application's logging setup alone.
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    
+    file_handler = logging.FileHandler('tax_parser.log')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    # Buffer log file writes; flushed every 1024 records, on errors and at exit
+    logging.getLogger().addHandler(
+        logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=file_handler)
+    )
+
+
 def main():
     """
     Main function to run the tax form processor
     """
+    _configure_logging()
+    
     try:
         logger.info("Starting IRS Tax Form Parser")
         
-        # Initialize processor
-        processor = TaxFormProcessor()
-        
-        # Default CSV path
-        csv_path = os.path.join('data', 'tax_forms.csv')
-        
-        if not os.path.exists(csv_path):
-            logger.error(f"CSV file not found: {csv_path}")
-            print(f"Error: CSV file not found at {csv_path}")
-            return
-        
-        # Process forms
-        print("Processing tax forms...")
-        results = processor.process_and_file(csv_path, submit_for_filing=False)
-        
-        # Display results
-        print("\n" + "="*50)
-        print("PROCESSING RESULTS")
-        print("="*50)
-        
-        summary = results['processing_summary']
-        print(f"Total Forms Processed: {summary['total_forms']}")
-        print(f"Successful: {summary['successful']}")
-        print(f"Warnings: {summary['warnings']}")
-        print(f"Errors: {summary['errors']}")
-        print(f"Success Rate: {summary['success_rate']:.1f}%")
-        
-        print("\n" + "="*50)
-        print("FORM DETAILS")
-        print("="*50)
-        
-        for result in results['processing_results']:
-            print(f"\nForm ID: {result['form_id']}")
-            print(f"Status: {result['processing_status']}")
-            
-            if 'extracted_fields' in result:
-                print("Extracted Fields:")
-                for field, value in result['extracted_fields'].items():
-                    print(f"  {field}: {value}")
-            
-            if 'validation' in result and result['validation']['errors']:
-                print(f"Validation Errors: {result['validation']['errors']}")
+        # Initialize processor (closes its database connection on exit)
+        with TaxFormProcessor() as processor:
+            # Default CSV path
+            csv_path = os.path.join('data', 'tax_forms.csv')
+            
+            if not os.path.exists(csv_path):
+                logger.error(f"CSV file not found: {csv_path}")
+                print(f"Error: CSV file not found at {csv_path}")
+                return
+            
+            # Process forms
+            print("Processing tax forms...")
+            results = processor.process_and_file(csv_path, submit_for_filing=False)
+            
+            # Display results, built up front and written in one call
+            lines = ["", "="*50, "PROCESSING RESULTS", "="*50]
+            
+            summary = results['processing_summary']
+            lines.append(f"Total Forms Processed: {summary['total_forms']}")
+            lines.append(f"Successful: {summary['successful']}")
+            lines.append(f"Warnings: {summary['warnings']}")
+            lines.append(f"Errors: {summary['errors']}")
+            lines.append(f"Success Rate: {summary['success_rate']:.1f}%")
+            
+            lines.extend(["", "="*50, "FORM DETAILS", "="*50])
+            
+            for result in results['processing_results']:
+                lines.append(f"\nForm ID: {result['form_id']}")
+                lines.append(f"Status: {result['processing_status']}")
+                
+                if 'extracted_fields' in result:
+                    lines.append("Extracted Fields:")
+                    for field, value in result['extracted_fields'].items():
+                        lines.append(f"  {field}: {value}")
+                
+                if 'validation' in result and result['validation']['errors']:
+                    lines.append(f"Validation Errors: {result['validation']['errors']}")
+                
+                if 'error' in result:
+                    lines.append(f"Error: {result['error']}")
             
-            if 'error' in result:
-                print(f"Error: {result['error']}")
+            sys.stdout.write("\n".join(lines) + "\n")
         
         logger.info("IRS Tax Form Parser completed successfully")
         
@@ -7,27 +7,104 @@ using spaCy and regex patterns.
 
 import spacy
 import re
+import copy
+import hashlib
 import logging
+import functools
+from types import MappingProxyType
+from collections import OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of spaCy analyses kept in the per-processor LRU cache
+ANALYSIS_CACHE_SIZE = 1024
+
+# Regex patterns for common tax form fields, compiled once at import and
+# shared read-only by every NLPProcessor. None of them use ^ or $, so
+# re.MULTILINE would have no effect.
+FIELD_PATTERNS = MappingProxyType({
+    'name': re.compile(r'Name[:\s]+([A-Za-z\s]+?)(?:\n|SSN|Social Security)', re.IGNORECASE),
+    'ssn': re.compile(r'(?:SSN|Social Security Number)[:\s]*(\d{3}-?\d{2}-?\d{4})', re.IGNORECASE),
+    'wages': re.compile(r'(?:Wages|Income)[:\s]*\$?([0-9,]+(?:\.\d{2})?)', re.IGNORECASE),
+    'filing_status': re.compile(r'Filing Status[:\s]*(Single|Married Filing Jointly|Married Filing Separately|Head of Household|Qualifying Widow)', re.IGNORECASE),
+    'address': re.compile(r'Address[:\s]+([A-Za-z0-9\s,]+?)(?:\n|City)', re.IGNORECASE),
+    'city': re.compile(r'City[:\s]+([A-Za-z\s]+)', re.IGNORECASE),
+    'state': re.compile(r'State[:\s]+([A-Z]{2})', re.IGNORECASE),
+    'zip_code': re.compile(r'(?:ZIP|Zip Code)[:\s]*(\d{5}(?:-\d{4})?)', re.IGNORECASE),
+    'tax_year': re.compile(r'(?:Tax Year|Year)[:\s]*(\d{4})', re.IGNORECASE),
+    'federal_tax_withheld': re.compile(r'Federal Tax Withheld[:\s]*\$?([0-9,]+(?:\.\d{2})?)', re.IGNORECASE)
+})
+
+# Valid SSN format for validation, with or without dashes
+SSN_FORMAT = re.compile(r'^\d{3}-?\d{2}-?\d{4}$')
+
+# Deletes '$' and ',' from monetary strings (str.translate, no regex)
+CURRENCY_STRIP_TABLE = str.maketrans('', '', '$,')
+
+# Fields checked by validate_extracted_data, in reporting order
+VALIDATED_FIELDS = ('ssn', 'wages', 'federal_tax_withheld', 'tax_year')
+
+# Pipeline components the analysis never reads: only doc.ents (ner) and the
+# lexical token.like_num attribute are used. In en_core_web_sm the ner
+# component has its own internal tok2vec, so the shared one can go as well.
+DISABLED_PIPES = ("tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer")
+
+
+@functools.lru_cache(maxsize=None)
+def load_spacy_model(model_name="en_core_web_sm", disable=DISABLED_PIPES):
+    """
+    Load a spaCy model once per process
+    
+    Every NLPProcessor in a process (including the one each pool worker
+    builds) shares the same loaded pipeline.
+    
+    Args:
+        model_name (str): Name of the spaCy model package
+        disable (tuple): Pipeline components to disable
+        
+    Returns:
+        spacy.language.Language: Loaded spaCy pipeline
+    """
+    return spacy.load(model_name, disable=list(disable))
+
 
 class NLPProcessor:
     """
     NLP processor for extracting structured data from tax form text using spaCy
     """
     
-    def __init__(self):
-        """Initialize NLP Processor with spaCy model"""
-        try:
-            # Load spaCy English model
-            self.nlp = spacy.load("en_core_web_sm")
-            logger.info("Successfully loaded spaCy en_core_web_sm model")
-        except OSError:
-            logger.error("spaCy en_core_web_sm model not found. Install with: python -m spacy download en_core_web_sm")
-            raise
+    def __init__(self, batch_size=64, n_process=1):
+        """
+        Initialize NLP Processor with spaCy model
+        
+        Args:
+            batch_size (int): Default number of texts per nlp.pipe batch
+            n_process (int): Processes nlp.pipe uses for batched analysis
+                (-1 for all CPUs); keep at 1 inside pool workers
+        """
+        self.batch_size = batch_size
+        self.n_process = n_process
+        
+        # spaCy model is loaded on first use, so regex-only callers never pay for it
+        self._nlp = None
+        
+        # Recurring form texts (templates, resubmissions) skip spaCy entirely
+        self._analysis_cache = OrderedDict()
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first access"""
+        if self._nlp is None:
+            try:
+                # Load spaCy English model (shared across processors in this process)
+                self._nlp = load_spacy_model("en_core_web_sm")
+                logger.info("Successfully loaded spaCy en_core_web_sm model")
+            except OSError:
+                logger.error("spaCy en_core_web_sm model not found. Install with: python -m spacy download en_core_web_sm")
+                raise
+        return self._nlp
     
     def extract_fields(self, raw_text):
         """
@@ -41,88 +118,238 @@ class NLPProcessor:
         """
         extracted_data = {}
         
-        # Define regex patterns for common tax form fields
-        patterns = {
-            'name': r'Name[:\s]+([A-Za-z\s]+?)(?:\n|SSN|Social Security)',
-            'ssn': r'(?:SSN|Social Security Number)[:\s]*(\d{3}-?\d{2}-?\d{4})',
-            'wages': r'(?:Wages|Income)[:\s]*\$?([0-9,]+(?:\.\d{2})?)',
-            'filing_status': r'Filing Status[:\s]*(Single|Married Filing Jointly|Married Filing Separately|Head of Household|Qualifying Widow)',
-            'address': r'Address[:\s]+([A-Za-z0-9\s,]+?)(?:\n|City)',
-            'city': r'City[:\s]+([A-Za-z\s]+)',
-            'state': r'State[:\s]+([A-Z]{2})',
-            'zip_code': r'(?:ZIP|Zip Code)[:\s]*(\d{5}(?:-\d{4})?)',
-            'tax_year': r'(?:Tax Year|Year)[:\s]*(\d{4})',
-            'federal_tax_withheld': r'Federal Tax Withheld[:\s]*\$?([0-9,]+(?:\.\d{2})?)'
+        for field_name, pattern in FIELD_PATTERNS.items():
+            match = pattern.search(raw_text)
+            if match:
+                extracted_data[field_name] = self._clean_value(field_name, match.group(1).strip())
+                logger.info(f"Extracted {field_name}: {extracted_data[field_name]}")
+        
+        return extracted_data
+    
+    def extract_and_validate(self, raw_text):
+        """
+        Extract fields and validate each one as soon as it is extracted
+        
+        Equivalent to extract_fields followed by validate_extracted_data, but
+        in a single pass over the field patterns. Messages are listed in
+        field-pattern order.
+        
+        Args:
+            raw_text (str): Raw text from tax form
+            
+        Returns:
+            tuple: Dictionary with extracted fields and validation results
+        """
+        extracted_data = {}
+        validation_results = {
+            'valid': True,
+            'errors': [],
+            'warnings': []
         }
         
-        for field_name, pattern in patterns.items():
-            match = re.search(pattern, raw_text, re.IGNORECASE | re.MULTILINE)
+        for field_name, pattern in FIELD_PATTERNS.items():
+            match = pattern.search(raw_text)
             if match:
-                value = match.group(1).strip()
-                # Clean up extracted value
-                if field_name in ['wages', 'federal_tax_withheld']:
-                    # Remove commas and convert to float for monetary values
-                    value = value.replace(',', '')
-                    try:
-                        extracted_data[field_name] = float(value)
-                    except ValueError:
-                        extracted_data[field_name] = value
-                else:
-                    extracted_data[field_name] = value
-                
+                value = self._clean_value(field_name, match.group(1).strip())
+                extracted_data[field_name] = value
+                self._validate_field(field_name, value, validation_results)
                 logger.info(f"Extracted {field_name}: {value}")
         
-        return extracted_data
+        return extracted_data, validation_results
     
-    def process_with_spacy(self, text):
+    @staticmethod
+    def _clean_value(field_name, value):
+        """
+        Clean up an extracted value
+        
+        Args:
+            field_name (str): Name of the extracted field
+            value (str): Matched text
+            
+        Returns:
+            float or str: Monetary values as floats when parseable, else the text
+        """
+        if field_name in ['wages', 'federal_tax_withheld']:
+            # Remove commas and convert to float for monetary values
+            value = value.translate(CURRENCY_STRIP_TABLE)
+            try:
+                return float(value)
+            except ValueError:
+                return value
+        return value
+    
+    def process_with_spacy(self, text, key=None):
         """
         Process text with spaCy for additional NLP analysis
         
         Args:
             text (str): Text to process
+            key (bytes): cache_key of the text, if already computed (optional)
             
         Returns:
             dict: Dictionary with spaCy analysis results
+            
+        Raises:
+            OSError: If the spaCy model is not installed
         """
+        if key is None:
+            key = self.cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        # A missing model is a deployment error, not a per-text failure, so it
+        # is raised instead of being logged and swallowed below
+        nlp = self.nlp
+        
         try:
             # Process text with spaCy
-            doc = self.nlp(text)
+            doc = nlp(text)
+            analysis = self._summarize_doc(doc)
+            self._cache_put(key, analysis)
+            return analysis
             
-            # Extract entities
-            entities = []
-            for ent in doc.ents:
-                entities.append({
-                    'text': ent.text,
-                    'label': ent.label_,
-                    'start': ent.start_char,
-                    'end': ent.end_char
-                })
+        except Exception as e:
+            logger.error(f"Error processing text with spaCy: {str(e)}")
+            return {}
+    
+    def process_texts_with_spacy(self, texts, batch_size=None, keys=None):
+        """
+        Process several texts with spaCy in batches
+        
+        Uses nlp.pipe so the per-call pipeline overhead is paid once per batch
+        instead of once per document, spread over n_process processes.
+        
+        Args:
+            texts (list): Texts to process
+            batch_size (int): Number of texts spaCy processes per batch
+                (optional, defaults to the processor's batch_size)
+            keys (list): cache_key of each text, if already computed (optional)
             
-            # Extract numbers (potential amounts)
-            numbers = []
-            for token in doc:
-                if token.like_num:
-                    numbers.append({
-                        'text': token.text,
-                        'position': token.idx
-                    })
+        Returns:
+            list: spaCy analysis results, one dict per input text
             
-            # Extract money amounts using spaCy's MONEY entity
-            money_entities = [ent.text for ent in doc.ents if ent.label_ == "MONEY"]
+        Raises:
+            OSError: If the spaCy model is not installed
+        """
+        if keys is None:
+            keys = [self.cache_key(text) for text in texts]
+        results = [self._cache_get(key) for key in keys]
+        
+        # Only texts that are not cached go through spaCy
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        # Raised rather than swallowed, as in process_with_spacy
+        nlp = self.nlp
+        
+        try:
+            docs = nlp.pipe((texts[i] for i in pending),
+                                 batch_size=batch_size or self.batch_size,
+                                 n_process=self.n_process)
+            for i, doc in zip(pending, docs):
+                results[i] = self._summarize_doc(doc)
+                self._cache_put(keys[i], results[i])
+            return results
             
-            # Extract person names using spaCy's PERSON entity
-            person_names = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+        except Exception as e:
+            logger.error(f"Error processing texts with spaCy: {str(e)}")
+            # Keep cached and already analyzed texts; only the rest come back empty
+            return [{} if result is None else result for result in results]
+    
+    def clear_cache(self):
+        """Drop all cached spaCy analyses"""
+        self._analysis_cache.clear()
+    
+    @staticmethod
+    def cache_key(text):
+        """
+        Build the cache key for a text
+        
+        Callers that also memoize per-text results can compute the key once
+        and pass it to the spaCy methods.
+        
+        Args:
+            text (str): Text to process
             
-            return {
-                'entities': entities,
-                'numbers': numbers,
-                'money_entities': money_entities,
-                'person_names': person_names
-            }
+        Returns:
+            bytes: 16-byte blake2b digest of the text
+        """
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _cache_get(self, key):
+        """
+        Look up a cached analysis and mark it as recently used
+        
+        Args:
+            key (bytes): Analysis cache key
             
-        except Exception as e:
-            logger.error(f"Error processing text with spaCy: {str(e)}")
-            return {}
+        Returns:
+            dict: Copy of the cached spaCy analysis results, or None on a miss
+        """
+        analysis = self._analysis_cache.get(key)
+        if analysis is not None:
+            self._analysis_cache.move_to_end(key)
+            # Every caller gets its own copy, as results from pool workers do
+            analysis = copy.deepcopy(analysis)
+        return analysis
+    
+    def _cache_put(self, key, analysis):
+        """
+        Store an analysis, evicting the least recently used one when full
+        
+        Args:
+            key (bytes): Analysis cache key
+            analysis (dict): spaCy analysis results
+        """
+        self._analysis_cache[key] = copy.deepcopy(analysis)
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+    
+    def _summarize_doc(self, doc):
+        """
+        Build the analysis results for a processed spaCy document
+        
+        Args:
+            doc (spacy.tokens.Doc): Processed document
+            
+        Returns:
+            dict: Dictionary with spaCy analysis results
+        """
+        # Extract entities, money amounts (MONEY) and person names (PERSON)
+        # in a single pass over doc.ents
+        entities = []
+        money_entities = []
+        person_names = []
+        for ent in doc.ents:
+            label = ent.label_
+            entities.append({
+                'text': ent.text,
+                'label': label,
+                'start': ent.start_char,
+                'end': ent.end_char
+            })
+            if label == "MONEY":
+                money_entities.append(ent.text)
+            elif label == "PERSON":
+                person_names.append(ent.text)
+        
+        # Extract numbers (potential amounts)
+        numbers = []
+        for token in doc:
+            if token.like_num:
+                numbers.append({
+                    'text': token.text,
+                    'position': token.idx
+                })
+        
+        return {
+            'entities': entities,
+            'numbers': numbers,
+            'money_entities': money_entities,
+            'person_names': person_names
+        }
     
     def validate_extracted_data(self, extracted_data):
         """
@@ -140,36 +367,47 @@ class NLPProcessor:
             'warnings': []
         }
         
+        for field in VALIDATED_FIELDS:
+            if field in extracted_data:
+                self._validate_field(field, extracted_data[field], validation_results)
+        
+        return validation_results
+    
+    @staticmethod
+    def _validate_field(field, value, validation_results):
+        """
+        Validate one extracted field, recording problems in validation_results
+        
+        Args:
+            field (str): Name of the extracted field
+            value: Extracted value
+            validation_results (dict): Validation results to update
+        """
         # Validate SSN format
-        if 'ssn' in extracted_data:
-            ssn = extracted_data['ssn']
-            if not re.match(r'^\d{3}-?\d{2}-?\d{4}$', ssn):
-                validation_results['errors'].append(f"Invalid SSN format: {ssn}")
+        if field == 'ssn':
+            if not SSN_FORMAT.match(value):
+                validation_results['errors'].append(f"Invalid SSN format: {value}")
                 validation_results['valid'] = False
         
         # Validate monetary amounts
-        for field in ['wages', 'federal_tax_withheld']:
-            if field in extracted_data:
-                try:
-                    amount = float(str(extracted_data[field]).replace(',', ''))
-                    if amount < 0:
-                        validation_results['warnings'].append(f"Negative amount for {field}: {amount}")
-                except (ValueError, TypeError):
-                    validation_results['errors'].append(f"Invalid monetary value for {field}: {extracted_data[field]}")
-                    validation_results['valid'] = False
+        elif field in ['wages', 'federal_tax_withheld']:
+            try:
+                amount = float(str(value).translate(CURRENCY_STRIP_TABLE))
+                if amount < 0:
+                    validation_results['warnings'].append(f"Negative amount for {field}: {amount}")
+            except (ValueError, TypeError):
+                validation_results['errors'].append(f"Invalid monetary value for {field}: {value}")
+                validation_results['valid'] = False
         
         # Validate tax year
-        if 'tax_year' in extracted_data:
-            year = extracted_data['tax_year']
+        elif field == 'tax_year':
             try:
-                year_int = int(year)
+                year_int = int(value)
                 if year_int < 1900 or year_int > 2030:
-                    validation_results['warnings'].append(f"Unusual tax year: {year}")
+                    validation_results['warnings'].append(f"Unusual tax year: {value}")
             except ValueError:
-                validation_results['errors'].append(f"Invalid tax year format: {year}")
+                validation_results['errors'].append(f"Invalid tax year format: {value}")
                 validation_results['valid'] = False
-        
-        return validation_results
 
 
 if __name__ == "__main__":
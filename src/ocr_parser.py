@@ -8,14 +8,27 @@ reading from CSV files and processing PDF documents.
 import pandas as pd
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+import pdfplumber
+# pyarrow is optional; read_csv falls back to pandas without it
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
 import os
+import tempfile
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on pages handed to a single Tesseract run; very long list
+# files are known to stall Tesseract
+PDF_OCR_BATCH_PAGES = 50
+
 
 class OCRParser:
     """
@@ -39,20 +52,81 @@ class OCRParser:
         Raises:
             FileNotFoundError: If CSV file is not found
         """
+        forms_data = None
+        if pacsv is not None:
+            try:
+                forms_data = self._read_csv_arrow(data_path)
+            except pa.ArrowInvalid as e:
+                logger.warning(f"pyarrow could not parse {data_path}, falling back to pandas: {str(e)}")
+        if forms_data is None:
+            forms_data = list(self.iter_csv(data_path))
+        logger.info(f"Successfully read {len(forms_data)} forms from {data_path}")
+        return forms_data
+    
+    def _read_csv_arrow(self, data_path):
+        """
+        Read form_id and raw_text from a CSV file with pyarrow's parser
+        
+        Arrow parses the file on several threads and builds the row dicts
+        without going through pandas.
+        
+        Args:
+            data_path (str): Path to CSV file
+            
+        Returns:
+            list: List of dictionaries with form_id and raw_text
+            
+        Raises:
+            FileNotFoundError: If CSV file is not found
+            pyarrow.ArrowInvalid: If pyarrow cannot parse the file
+        """
         try:
-            # Read CSV file using pandas
-            df = pd.read_csv(data_path)
+            if not os.path.exists(data_path):
+                raise FileNotFoundError(f"CSV file not found: {data_path}")
+            
+            # raw_text holds whole multi-line forms inside quoted values
+            parse_options = pacsv.ParseOptions(newlines_in_values=True)
+            convert_options = pacsv.ConvertOptions(
+                include_columns=['form_id', 'raw_text'],
+                column_types={'form_id': pa.string(), 'raw_text': pa.string()}
+            )
+            return pacsv.read_csv(data_path, parse_options=parse_options,
+                                  convert_options=convert_options).to_pylist()
+            
+        except FileNotFoundError:
+            logger.error(f"CSV file not found: {data_path}")
+            raise
+        except pa.ArrowInvalid:
+            # read_csv falls back to pandas for files pyarrow cannot parse
+            raise
+        except Exception as e:
+            logger.error(f"Error reading CSV file: {str(e)}")
+            raise
+    
+    def iter_csv(self, data_path, chunksize=1000):
+        """
+        Stream dicts with form_id and raw_text from a CSV file
+        
+        Only the form_id and raw_text columns are parsed, and at most
+        chunksize rows are held in memory at a time. Both columns are read as
+        strings, and empty cells come through as '' (as from read_csv).
+        
+        Args:
+            data_path (str): Path to CSV file
+            chunksize (int): Number of rows pandas reads per chunk
             
-            # Convert to list of dictionaries
-            forms_data = []
-            for _, row in df.iterrows():
-                forms_data.append({
-                    'form_id': row['form_id'],
-                    'raw_text': row['raw_text']
-                })
+        Yields:
+            dict: Dictionary with form_id and raw_text
             
-            logger.info(f"Successfully read {len(forms_data)} forms from {data_path}")
-            return forms_data
+        Raises:
+            FileNotFoundError: If CSV file is not found
+        """
+        try:
+            # Read CSV file using pandas, one chunk at a time; both columns stay
+            # strings, as in the pyarrow reader
+            for chunk in pd.read_csv(data_path, usecols=['form_id', 'raw_text'], dtype=str,
+                                     keep_default_na=False, chunksize=chunksize):
+                yield from chunk[['form_id', 'raw_text']].to_dict(orient='records')
             
         except FileNotFoundError:
             logger.error(f"CSV file not found: {data_path}")
@@ -61,12 +135,14 @@ class OCRParser:
             logger.error(f"Error reading CSV file: {str(e)}")
             raise
     
-    def extract_from_pdf(self, pdf_path):
+    def extract_from_pdf(self, pdf_path, page_workers=None):
         """
         Extract text from PDF file using OCR
         
         Args:
             pdf_path (str): Path to PDF file
+            page_workers (int): Concurrent Tesseract runs and Poppler render
+                threads for this PDF (defaults to CPU count)
             
         Returns:
             str: Extracted raw text from all pages
@@ -78,20 +154,56 @@ class OCRParser:
             if not os.path.exists(pdf_path):
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            # Convert PDF pages to images
-            pages = convert_from_path(pdf_path, dpi=300)
+            # Born-digital pages carry a text layer that can be read directly
+            try:
+                with pdfplumber.open(pdf_path) as pdf:
+                    all_text = [(page.extract_text() or '').strip() for page in pdf.pages]
+            except Exception as e:
+                # Poppler may still render a PDF pdfplumber cannot read, so OCR every page
+                logger.warning(f"Could not read embedded text from {pdf_path}, OCR'ing all pages: {str(e)}")
+                all_text = [''] * pdfinfo_from_path(pdf_path)['Pages']
+            
+            # Only pages without embedded text need rasterizing and OCR
+            missing = [i for i, text in enumerate(all_text) if not text]
+            if missing:
+                page_workers = max(1, page_workers or os.cpu_count() or 1)
+                
+                # Convert each run of consecutive pages that lack text to images,
+                # so pages with text between them are never rasterized
+                indexed_pages = []
+                for run in _consecutive_runs(missing):
+                    # Grayscale is all Tesseract needs and a third of the RGB size
+                    pages = convert_from_path(pdf_path, dpi=300, first_page=run[0] + 1, last_page=run[-1] + 1,
+                                              grayscale=True, thread_count=min(len(run), page_workers))
+                    indexed_pages.extend(zip(run, pages))
+                
+                # Split pages into batches so each Tesseract run covers several
+                # pages, and OCR the batches concurrently
+                workers = min(len(indexed_pages), page_workers)
+                batch_size = max(1, min(PDF_OCR_BATCH_PAGES, -(-len(indexed_pages) // workers)))
+                batches = [indexed_pages[start:start + batch_size]
+                           for start in range(0, len(indexed_pages), batch_size)]
+                
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    path_batches = [self._save_pages(batch, tmpdir) for batch in batches]
+                    if workers > 1:
+                        # Concurrent runs each start their own OpenMP threads, so they
+                        # run from worker processes that keep Tesseract single-threaded
+                        # (one engine per core); this process's environment is untouched
+                        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker) as executor:
+                            batch_texts = list(executor.map(_extract_images_in_worker, path_batches))
+                    else:
+                        batch_texts = [self.extract_from_images(image_paths) for image_paths in path_batches]
+                
+                for batch, batch_text in zip(batches, batch_texts):
+                    for (i, _), text in zip(batch, batch_text):
+                        all_text[i] = text
             
-            # Extract text from each page
-            all_text = []
-            for i, page in enumerate(pages):
-                # Use pytesseract to extract text from image
-                text = pytesseract.image_to_string(page)
-                all_text.append(text.strip())
-                logger.info(f"Extracted text from page {i+1}")
+            logger.info(f"Read embedded text from {len(all_text) - len(missing)} pages, OCR'd {len(missing)} pages")
             
             # Combine all pages
             raw_text = '\n\n'.join(all_text)
-            logger.info(f"Successfully extracted text from {len(pages)} pages")
+            logger.info(f"Successfully extracted text from {len(all_text)} pages")
             
             return raw_text
             
@@ -101,6 +213,166 @@ class OCRParser:
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise
+    
+    def extract_from_pdfs(self, pdf_paths, max_workers=None):
+        """
+        Extract text from several PDF files on a process pool
+        
+        Each worker process builds its own parser and OCRs its PDF with a single
+        Tesseract run and Poppler thread at a time, so the pool keeps about one
+        engine per core.
+        
+        Args:
+            pdf_paths (list): Paths to PDF files
+            max_workers (int): Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            list: Extracted raw text for each PDF, in input order
+            
+        Raises:
+            FileNotFoundError: If a PDF file is not found
+        """
+        if len(pdf_paths) <= 1:
+            return [self.extract_from_pdf(pdf_path) for pdf_path in pdf_paths]
+        
+        workers = max(1, min(len(pdf_paths), max_workers or os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker) as executor:
+            all_text = list(executor.map(_extract_pdf_in_worker, pdf_paths))
+        
+        logger.info(f"Successfully extracted text from {len(pdf_paths)} PDFs")
+        return all_text
+    
+    def _save_pages(self, indexed_pages, tmpdir):
+        """
+        Write a batch of rendered PDF pages to image files for Tesseract
+        
+        Args:
+            indexed_pages (list): (zero-based page index, PIL image) pairs
+            tmpdir (str): Directory the page images are written to
+            
+        Returns:
+            list: Image file paths, in input order
+        """
+        image_paths = []
+        for i, page in indexed_pages:
+            # Uncompressed BMP skips the zlib pass PNG would spend on a file
+            # that is read once and deleted
+            image_path = os.path.join(tmpdir, f"page_{i}.bmp")
+            page.save(image_path)
+            image_paths.append(image_path)
+        return image_paths
+    
+    def extract_from_images(self, image_paths):
+        """
+        Extract text from several image files with a single Tesseract run
+        
+        Tesseract accepts a text file listing one image per line, so the engine
+        starts once for the whole batch instead of once per image.
+        
+        Args:
+            image_paths (list): Paths to image files
+            
+        Returns:
+            list: Extracted raw text for each image, in input order
+            
+        Raises:
+            FileNotFoundError: If an image file is not found
+        """
+        try:
+            for image_path in image_paths:
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
+            
+            if not image_paths:
+                return []
+            
+            # Write the list file Tesseract reads image paths from
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as list_file:
+                list_file.write('\n'.join(os.path.abspath(path) for path in image_paths))
+            
+            try:
+                text = pytesseract.image_to_string(list_file.name)
+            finally:
+                os.remove(list_file.name)
+            
+            # Tesseract separates the output of each image with a form feed
+            all_text = [page.strip() for page in text.split('\f')]
+            all_text += [''] * (len(image_paths) - len(all_text))
+            
+            logger.info(f"Successfully extracted text from {len(image_paths)} images")
+            return all_text[:len(image_paths)]
+            
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting text from images: {str(e)}")
+            raise
+
+
+def _consecutive_runs(indices):
+    """
+    Split sorted page indices into runs of consecutive pages
+    
+    Args:
+        indices (list): Sorted, distinct page indices
+        
+    Returns:
+        list: Lists of consecutive page indices, in order
+    """
+    runs = []
+    for i in indices:
+        if runs and i == runs[-1][-1] + 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    return runs
+
+
+# OCRParser owned by the current PDF worker process
+_worker_parser = None
+
+
+def _init_pdf_worker():
+    """
+    Build one OCRParser per worker process and keep Tesseract single-threaded
+    
+    Tesseract is spawned per page batch and inherits OMP_THREAD_LIMIT, so one
+    engine thread per process keeps the pool from oversubscribing the cores.
+    The limit is set only in the worker, never in the parent process.
+    """
+    global _worker_parser
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    _worker_parser = OCRParser()
+
+
+def _extract_pdf_in_worker(pdf_path):
+    """
+    Extract text from one PDF file inside a worker process
+    
+    The pool already spreads PDFs across the cores, so pages within a PDF
+    are not OCR'd concurrently.
+    
+    Args:
+        pdf_path (str): Path to PDF file
+        
+    Returns:
+        str: Extracted raw text from all pages
+    """
+    return _worker_parser.extract_from_pdf(pdf_path, page_workers=1)
+
+
+def _extract_images_in_worker(image_paths):
+    """
+    Extract text from a batch of page images inside a worker process
+    
+    Args:
+        image_paths (list): Paths to image files
+        
+    Returns:
+        list: Extracted raw text for each image, in input order
+    """
+    return _worker_parser.extract_from_images(image_paths)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""
+Shared pytest configuration for the tests package
+"""
+
+import sys
+import pathlib
+
+# Make the repository root importable once per process so tests can use
+# "from src..." imports
+repo_root = str(pathlib.Path(__file__).resolve().parent.parent)
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
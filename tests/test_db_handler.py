@@ -3,265 +3,212 @@ Test module for Database Handler functionality
 """
 
 import unittest
-import tempfile
-import os
-from unittest.mock import patch, Mock
-from datetime import datetime
-import sys
+from unittest.mock import patch, MagicMock
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# src.db_handler pulls in the MySQL driver, so it is imported on first use
+# rather than when pytest collects this module
+db_handler = None
 
-from src.db_handler import DatabaseHandler, TaxFormRecord
 
+def _import_src():
+    """Bind the module under test"""
+    global db_handler
+    from src import db_handler
 
-class TestDatabaseHandler(unittest.TestCase):
-    """Test cases for Database Handler"""
+
+class TestDBHandler(unittest.TestCase):
+    """Test cases for DBHandler single-form operations"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Use temporary SQLite database for testing
-        self.temp_db_path = tempfile.mktemp(suffix='.db')
-        connection_string = f"sqlite:///{self.temp_db_path}"
-        self.db_handler = DatabaseHandler(db_type='sqlite', connection_string=connection_string)
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        _import_src()
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        self.db_handler.close_connection()
-        if os.path.exists(self.temp_db_path):
-            os.remove(self.temp_db_path)
+    def setUp(self):
+        """Give a handler a mocked MySQL connection"""
+        self.handler = db_handler.DBHandler()
+        self.connection = MagicMock()
+        self.cursor = self.connection.cursor.return_value
+        self.handler.connection = self.connection
     
     def test_initialization(self):
-        """Test database handler initialization"""
-        self.assertIsInstance(self.db_handler, DatabaseHandler)
-        self.assertEqual(self.db_handler.db_type, 'sqlite')
-    
-    def test_insert_tax_form(self):
-        """Test inserting a tax form record"""
-        # Create test record
-        test_record = TaxFormRecord(
-            form_type='1040',
-            form_name='Individual Income Tax Return',
-            tax_year=2023,
-            file_path='/test/path/form.pdf',
-            processing_status='processed',
-            fields_extracted={'name': 'John Doe', 'ssn': '123-45-6789'},
-            confidence_score=0.95
-        )
-        
-        # Insert record
-        form_id = self.db_handler.insert_tax_form(test_record)
+        """Test that a new handler is not connected"""
+        handler = db_handler.DBHandler(host='db', database='forms')
         
-        self.assertIsNotNone(form_id)
-        self.assertTrue(form_id.startswith('FORM_'))
+        self.assertEqual((handler.host, handler.user, handler.database), ('db', 'root', 'forms'))
+        self.assertIsNone(handler.connection)
     
-    def test_get_tax_form(self):
-        """Test retrieving a tax form record"""
-        # Insert test record first
-        test_record = TaxFormRecord(
-            form_type='W2',
-            form_name='Wage and Tax Statement',
-            tax_year=2023,
-            file_path='/test/path/w2.pdf',
-            processing_status='processed',
-            confidence_score=0.88
-        )
-        
-        form_id = self.db_handler.insert_tax_form(test_record)
+    def test_insert_form_data(self):
+        """Test that a form is inserted as one row and committed"""
+        self.cursor.lastrowid = 42
+        form_data = {'form_id': 'F1', 'form_type': '1040', 'name': 'John Doe', 'wages': 75000.0}
         
-        # Retrieve the record
-        retrieved_record = self.db_handler.get_tax_form(form_id)
+        self.assertEqual(self.handler.insert_form_data(form_data), 42)
         
-        self.assertIsNotNone(retrieved_record)
-        self.assertEqual(retrieved_record.form_type, 'W2')
-        self.assertEqual(retrieved_record.form_name, 'Wage and Tax Statement')
-        self.assertEqual(retrieved_record.confidence_score, 0.88)
+        self.cursor.execute.assert_called_once_with(
+            db_handler.INSERT_FORM_QUERY,
+            ('F1', '1040', 'John Doe', None, None, None, 75000.0, None, None, None, None, None, None))
+        self.connection.commit.assert_called_once()
+        self.cursor.close.assert_called_once()
     
-    def test_get_nonexistent_tax_form(self):
-        """Test retrieving a non-existent tax form"""
-        result = self.db_handler.get_tax_form('NONEXISTENT_FORM_ID')
-        self.assertIsNone(result)
-    
-    def test_update_tax_form(self):
-        """Test updating a tax form record"""
-        # Insert test record first
-        test_record = TaxFormRecord(
-            form_type='1040',
-            processing_status='pending',
-            confidence_score=0.7
-        )
+    def test_insert_form_data_rolls_back_on_error(self):
+        """Test that a failed insert is rolled back and reported"""
+        self.cursor.execute.side_effect = db_handler.Error("Duplicate entry")
         
-        form_id = self.db_handler.insert_tax_form(test_record)
+        self.assertIsNone(self.handler.insert_form_data({'form_id': 'F1'}))
         
-        # Update the record
-        updates = {
-            'processing_status': 'processed',
-            'confidence_score': 0.95,
-            'fields_extracted': {'name': 'Updated Name'}
-        }
+        self.connection.rollback.assert_called_once()
+        self.connection.commit.assert_not_called()
+    
+    def test_get_form_by_id(self):
+        """Test lookup of a stored form and of a missing one"""
+        self.cursor.fetchone.side_effect = [{'form_id': 'F1', 'taxpayer_name': 'John Doe'}, None]
         
-        success = self.db_handler.update_tax_form(form_id, updates)
-        self.assertTrue(success)
+        self.assertEqual(self.handler.get_form_by_id('F1')['taxpayer_name'], 'John Doe')
+        self.assertIsNone(self.handler.get_form_by_id('F2'))
         
-        # Verify the update
-        updated_record = self.db_handler.get_tax_form(form_id)
-        self.assertEqual(updated_record.processing_status, 'processed')
-        self.assertEqual(updated_record.confidence_score, 0.95)
-    
-    def test_update_nonexistent_tax_form(self):
-        """Test updating a non-existent tax form"""
-        success = self.db_handler.update_tax_form('NONEXISTENT_ID', {'status': 'processed'})
-        self.assertFalse(success)
+        self.connection.cursor.assert_called_with(dictionary=True)
+        self.assertEqual(self.cursor.execute.call_args.args[1], ('F2',))
     
-    def test_search_tax_forms(self):
-        """Test searching tax forms with filters"""
-        # Insert multiple test records
-        records = [
-            TaxFormRecord(form_type='1040', tax_year=2023, processing_status='processed'),
-            TaxFormRecord(form_type='1040', tax_year=2022, processing_status='pending'),
-            TaxFormRecord(form_type='W2', tax_year=2023, processing_status='processed'),
-        ]
+    def test_update_form_data(self):
+        """Test that form_id is never updated and the row count is reported"""
+        self.cursor.rowcount = 1
         
-        for record in records:
-            self.db_handler.insert_tax_form(record)
+        self.assertTrue(self.handler.update_form_data('F1', {'form_id': 'F9', 'wages': 80000.0}))
         
-        # Search by form type
-        results_1040 = self.db_handler.search_tax_forms({'form_type': '1040'})
-        self.assertEqual(len(results_1040), 2)
+        query, values = self.cursor.execute.call_args.args
+        self.assertIn("SET wages = %s, updated_at", query)
+        self.assertEqual(values, [80000.0, 'F1'])
         
-        # Search by status
-        results_processed = self.db_handler.search_tax_forms({'processing_status': 'processed'})
-        self.assertEqual(len(results_processed), 2)
-        
-        # Search by multiple criteria
-        results_combined = self.db_handler.search_tax_forms({
-            'form_type': '1040',
-            'processing_status': 'processed'
-        })
-        self.assertEqual(len(results_combined), 1)
+        self.assertFalse(self.handler.update_form_data('F1', {'form_id': 'F9'}))
+        self.cursor.execute.assert_called_once()
     
-    def test_get_processing_statistics(self):
-        """Test getting processing statistics"""
-        # Insert test records with various statuses and types
-        records = [
-            TaxFormRecord(form_type='1040', processing_status='processed', confidence_score=0.9),
-            TaxFormRecord(form_type='1040', processing_status='pending', confidence_score=0.8),
-            TaxFormRecord(form_type='W2', processing_status='processed', confidence_score=0.95),
-            TaxFormRecord(form_type='W2', processing_status='error', confidence_score=0.3),
-        ]
-        
-        for record in records:
-            self.db_handler.insert_tax_form(record)
+    def test_delete_form(self):
+        """Test deletion of a stored form and of a missing one"""
+        self.cursor.rowcount = 1
+        self.assertTrue(self.handler.delete_form('F1'))
         
-        stats = self.db_handler.get_processing_statistics()
+        self.cursor.rowcount = 0
+        self.assertFalse(self.handler.delete_form('F1'))
         
-        self.assertIsInstance(stats, dict)
-        self.assertIn('total_forms', stats)
-        self.assertIn('status_distribution', stats)
-        self.assertIn('form_type_distribution', stats)
-        self.assertEqual(stats['total_forms'], 4)
+        self.assertEqual(self.connection.commit.call_count, 2)
     
-    def test_generate_form_id(self):
-        """Test form ID generation"""
-        form_id1 = self.db_handler._generate_form_id()
-        form_id2 = self.db_handler._generate_form_id()
+    def test_log_processing(self):
+        """Test that a status entry is written and committed"""
+        self.assertTrue(self.handler.log_processing('F1', 'ERROR', 'Failed to insert data'))
         
-        self.assertTrue(form_id1.startswith('FORM_'))
-        self.assertTrue(form_id2.startswith('FORM_'))
-        self.assertNotEqual(form_id1, form_id2)  # Should be unique
+        self.cursor.execute.assert_called_once_with(db_handler.INSERT_LOG_QUERY,
+                                                    ('F1', 'ERROR', 'Failed to insert data'))
+        self.connection.commit.assert_called_once()
     
-    def test_search_with_pagination(self):
-        """Test search with pagination"""
-        # Insert multiple records
-        for i in range(5):
-            record = TaxFormRecord(
-                form_type='1040',
-                processing_status='processed',
-                confidence_score=0.9
-            )
-            self.db_handler.insert_tax_form(record)
-        
-        # Test pagination
-        results_page1 = self.db_handler.search_tax_forms({'form_type': '1040'}, limit=3, offset=0)
-        results_page2 = self.db_handler.search_tax_forms({'form_type': '1040'}, limit=3, offset=3)
+    def test_ensure_tables_runs_ddl_once(self):
+        """Test that the tables are created on first use only"""
+        self.assertTrue(self.handler.ensure_tables())
+        self.assertTrue(self.handler.ensure_tables())
         
-        self.assertEqual(len(results_page1), 3)
-        self.assertEqual(len(results_page2), 2)
+        self.assertEqual(self.cursor.execute.call_count, 2)
+        self.connection.commit.assert_called_once()
     
-    def test_invalid_database_type(self):
-        """Test initialization with invalid database type"""
-        with self.assertRaises(ValueError):
-            DatabaseHandler(db_type='invalid_type')
-    
-    def test_sql_to_record_conversion(self):
-        """Test conversion from SQLAlchemy model to TaxFormRecord"""
-        # Insert a record
-        test_record = TaxFormRecord(
-            form_type='1099',
-            form_name='Miscellaneous Income',
-            tax_year=2023,
-            confidence_score=0.87
-        )
+    def test_close_connection(self):
+        """Test that closing drops the connection so it is not reused"""
+        self.connection.is_connected.return_value = True
         
-        form_id = self.db_handler.insert_tax_form(test_record)
-        retrieved_record = self.db_handler.get_tax_form(form_id)
+        self.handler.close_connection()
         
-        # Verify all fields are properly converted
-        self.assertIsInstance(retrieved_record, TaxFormRecord)
-        self.assertEqual(retrieved_record.form_type, '1099')
-        self.assertEqual(retrieved_record.form_name, 'Miscellaneous Income')
-        self.assertEqual(retrieved_record.tax_year, 2023)
-        self.assertEqual(retrieved_record.confidence_score, 0.87)
+        self.connection.close.assert_called_once()
+        self.assertIsNone(self.handler.connection)
 
 
-class TestDatabaseHandlerMongoDB(unittest.TestCase):
-    """Test cases for MongoDB Database Handler"""
+class TestDBHandlerBatch(unittest.TestCase):
+    """Test cases for DBHandler batch writes and connection reuse"""
     
-    @patch('src.db_handler.pymongo.MongoClient')
-    def test_mongodb_initialization(self, mock_mongo_client):
-        """Test MongoDB database handler initialization"""
-        mock_client = Mock()
-        mock_db = Mock()
-        mock_collection = Mock()
-        
-        mock_mongo_client.return_value = mock_client
-        mock_client.tax_forms_db = mock_db
-        mock_db.tax_forms = mock_collection
-        
-        db_handler = DatabaseHandler(db_type='mongodb', connection_string='mongodb://localhost:27017/')
-        
-        self.assertEqual(db_handler.db_type, 'mongodb')
-        mock_mongo_client.assert_called_once_with('mongodb://localhost:27017/')
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        _import_src()
+        cls.db_handler = db_handler
     
-    @patch('src.db_handler.pymongo.MongoClient')
-    def test_mongodb_insert_tax_form(self, mock_mongo_client):
-        """Test inserting tax form in MongoDB"""
-        # Setup mocks
-        mock_client = Mock()
-        mock_db = Mock()
-        mock_collection = Mock()
-        mock_audit_collection = Mock()
-        
-        mock_mongo_client.return_value = mock_client
-        mock_client.tax_forms_db = mock_db
-        mock_db.tax_forms = mock_collection
-        mock_db.audit_logs = mock_audit_collection
-        
-        # Mock insert result
-        mock_result = Mock()
-        mock_result.inserted_id = 'test_object_id'
-        mock_collection.insert_one.return_value = mock_result
-        
-        db_handler = DatabaseHandler(db_type='mongodb')
-        
-        test_record = TaxFormRecord(
-            form_type='1040',
-            form_name='Individual Income Tax Return'
-        )
-        
-        form_id = db_handler.insert_tax_form(test_record)
-        
-        self.assertIsNotNone(form_id)
-        mock_collection.insert_one.assert_called_once()
+    def setUp(self):
+        """Give a handler a mocked MySQL connection"""
+        self.handler = self.db_handler.DBHandler()
+        self.connection = MagicMock()
+        self.cursor = self.connection.cursor.return_value
+        self.handler.connection = self.connection
+    
+    def test_insert_forms_batch_pages_rows_and_commits_once(self):
+        """Test that rows are sent in pages and committed in one transaction"""
+        forms = [{'form_id': f'F{i}', 'name': f'Taxpayer {i}', 'wages': 1000.0 * i, 'raw_text': 'text'}
+                 for i in range(5)]
+        
+        inserted = self.handler.insert_forms_batch(forms, page_size=2)
+        
+        self.assertEqual(inserted, 5)
+        calls = self.cursor.executemany.call_args_list
+        self.assertEqual([len(call.args[1]) for call in calls], [2, 2, 1])
+        for call in calls:
+            self.assertEqual(call.args[0], self.db_handler.INSERT_FORM_QUERY)
+        self.assertEqual(calls[0].args[1][1],
+                         ('F1', None, 'Taxpayer 1', None, None, None, 1000.0, None, None, None, None, None, 'text'))
+        self.connection.commit.assert_called_once()
+        self.connection.rollback.assert_not_called()
+        self.cursor.close.assert_called_once()
+    
+    def test_insert_forms_batch_rolls_back_on_error(self):
+        """Test that a failing row rolls back the batch and reports failure"""
+        self.cursor.executemany.side_effect = self.db_handler.Error("Incorrect decimal value")
+        
+        inserted = self.handler.insert_forms_batch([{'form_id': 'F1', 'wages': 'n/a'}])
+        
+        self.assertIsNone(inserted)
+        self.connection.rollback.assert_called_once()
+        self.connection.commit.assert_not_called()
+        self.cursor.close.assert_called_once()
+    
+    def test_log_processing_batch(self):
+        """Test that log entries are written with one executemany"""
+        entries = [('F1', 'SUCCESS', None), ('F2', 'ERROR', 'Failed to insert data')]
+        
+        self.assertTrue(self.handler.log_processing_batch(entries))
+        
+        self.cursor.executemany.assert_called_once_with(self.db_handler.INSERT_LOG_QUERY, entries)
+        self.connection.commit.assert_called_once()
+    
+    def test_log_processing_batch_error(self):
+        """Test that a failed log write reports failure"""
+        self.cursor.executemany.side_effect = self.db_handler.Error("Lost connection")
+        
+        self.assertFalse(self.handler.log_processing_batch([('F1', 'SUCCESS', None)]))
+        self.cursor.close.assert_called_once()
+    
+    def test_ensure_connection_reuses_live_connection(self):
+        """Test that a live connection is reused without reconnecting"""
+        with patch.object(self.handler, 'connect') as mock_connect:
+            self.assertTrue(self.handler.ensure_connection())
+        
+        self.connection.ping.assert_called_once_with(reconnect=True, attempts=1, delay=0)
+        mock_connect.assert_not_called()
+        self.assertIs(self.handler.connection, self.connection)
+    
+    def test_ensure_connection_reconnects_dropped_connection(self):
+        """Test that a connection that cannot be pinged is replaced"""
+        self.connection.ping.side_effect = self.db_handler.Error("MySQL server has gone away")
+        self.connection.is_connected.return_value = False
+        
+        with patch.object(self.handler, 'connect', return_value=True) as mock_connect:
+            self.assertTrue(self.handler.ensure_connection())
+        
+        mock_connect.assert_called_once_with()
+    
+    def test_connect_failure_keeps_no_connection(self):
+        """Test that a connection that never came up is not kept for reuse"""
+        self.handler.connection = None
+        failed_connection = MagicMock()
+        failed_connection.is_connected.return_value = False
+        
+        with patch('src.db_handler.mysql.connector.connect', return_value=failed_connection):
+            self.assertFalse(self.handler.ensure_connection())
+        
+        self.assertIsNone(self.handler.connection)
 
 
 if __name__ == '__main__':
@@ -3,395 +3,317 @@ Test module for Main Application functionality
 """
 
 import unittest
-import tempfile
+import io
+import csv
 import os
-import json
-from unittest.mock import patch, Mock, MagicMock
-from datetime import datetime
-import sys
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# src.main pulls in heavy dependencies, so it is imported on first use
+# rather than when pytest collects this module
+TaxFormProcessor = None
+
+
+def _import_src():
+    """Bind the classes under test from src.main"""
+    global TaxFormProcessor
+    from src.main import TaxFormProcessor
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.main import TaxFormProcessor
+# Form texts in the shipped CSV layout
+_JOHN_DOE_TEXT = "Form 1040\nName: John Doe\nSSN: 123-45-6789\nWages: 75000\nFiling Status: Single"
+_JANE_SMITH_TEXT = "Form 1040\nName: Jane Smith\nSSN: 987-65-4321\nWages: 85000"
+
+# CSV rows for the processor tests; form 2 has an empty raw_text cell
+_CSV_ROWS = (('1', _JOHN_DOE_TEXT), ('2', ''), ('3', _JANE_SMITH_TEXT))
 
 
 class TestTaxFormProcessor(unittest.TestCase):
-    """Test cases for Tax Form Processor"""
+    """Test cases for Tax Form Processor CSV processing"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        _import_src()
     
     def setUp(self):
-        """Set up test fixtures"""
-        self.temp_dir = tempfile.mkdtemp()
-        
-        # Create test configuration
-        self.test_config = {
-            'database_type': 'sqlite',
-            'enable_efiling': False,
-            'tesseract_path': None,
-            'output_directory': self.temp_dir,
-            'log_level': 'INFO'
-        }
-        
-        # Mock all components to avoid heavy initialization
-        with patch('src.main.OCRParser'), \
-             patch('src.main.NLPProcessor'), \
-             patch('src.main.DatabaseHandler'), \
-             patch('src.main.EFilingIntegration'):
-            
-            self.processor = TaxFormProcessor()
-            self.processor.config = self.test_config
+        """Build a processor with database and e-filing clients mocked"""
+        db_patcher = patch('src.main.DBHandler')
+        efiling_patcher = patch('src.main.EFilingIntegration')
+        self.mock_db_class = db_patcher.start()
+        self.addCleanup(db_patcher.stop)
+        efiling_patcher.start()
+        self.addCleanup(efiling_patcher.stop)
+        
+        # Every handler (the processor's and each writer's) is the same mock
+        self.db_handler = self.mock_db_class.return_value
+        self.db_handler.ensure_connection.return_value = True
+        self.db_handler.insert_forms_batch.side_effect = lambda forms, page_size=None: len(forms)
+        
+        self.processor = TaxFormProcessor(max_workers=1, enable_nlp_analysis=False)
+        
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.csv_path = os.path.join(temp_dir.name, 'tax_forms.csv')
+        with open(self.csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['form_id', 'raw_text'])
+            writer.writerows(_CSV_ROWS)
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    def test_process_csv_file(self):
+        """Test that every row is analyzed in order and a blank form is an error"""
+        results = self.processor.process_csv_file(self.csv_path)
+        
+        self.assertEqual([result['form_id'] for result in results], ['1', '2', '3'])
+        self.assertEqual([result['processing_status'] for result in results], ['SUCCESS', 'ERROR', 'SUCCESS'])
+        self.assertEqual(results[0]['extracted_fields']['name'], 'John Doe')
+        self.assertEqual(len({result['processed_at'] for result in results}), 1)
     
-    def test_load_configuration_defaults(self):
-        """Test loading default configuration"""
-        with patch('src.main.OCRParser'), \
-             patch('src.main.NLPProcessor'), \
-             patch('src.main.DatabaseHandler'):
-            
-            processor = TaxFormProcessor()
-            config = processor.config
-            
-            self.assertEqual(config['database_type'], 'sqlite')
-            self.assertFalse(config['enable_efiling'])
-            self.assertEqual(config['log_level'], 'INFO')
+    def test_analyzed_forms_are_stored(self):
+        """Test that the valid forms reach the database through one writer"""
+        self.processor.process_csv_file(self.csv_path)
+        
+        stored = [form['form_id'] for call in self.db_handler.insert_forms_batch.call_args_list
+                  for form in call.args[0]]
+        self.assertEqual(stored, ['1', '3'])
+        logged = [entry for call in self.db_handler.log_processing_batch.call_args_list
+                  for entry in call.args[0]]
+        self.assertEqual(logged, [('1', 'SUCCESS', None), ('3', 'SUCCESS', None)])
+        # The processor's own handler plus a single writer for a small file
+        self.assertEqual(self.mock_db_class.call_count, 2)
     
-    def test_load_configuration_from_file(self):
-        """Test loading configuration from file"""
-        # Create test config file
-        config_file = os.path.join(self.temp_dir, 'config.json')
-        test_config = {
-            'database_type': 'postgresql',
-            'enable_efiling': True,
-            'custom_setting': 'test_value'
-        }
+    def test_small_csv_is_analyzed_in_process(self):
+        """Test that a file too small to give every worker a batch skips the pool"""
+        self.processor.max_workers = 4
         
-        with open(config_file, 'w') as f:
-            json.dump(test_config, f)
+        with patch('src.main.ProcessPoolExecutor') as mock_pool:
+            results = self.processor.process_csv_file(self.csv_path)
         
-        with patch('src.main.OCRParser'), \
-             patch('src.main.NLPProcessor'), \
-             patch('src.main.DatabaseHandler'), \
-             patch('src.main.EFilingIntegration'):
-            
-            processor = TaxFormProcessor(config_path=config_file)
-            
-            self.assertEqual(processor.config['database_type'], 'postgresql')
-            self.assertTrue(processor.config['enable_efiling'])
-            self.assertEqual(processor.config['custom_setting'], 'test_value')
+        mock_pool.assert_not_called()
+        self.assertEqual(len(results), 3)
     
-    @patch.dict(os.environ, {
-        'DB_TYPE': 'mongodb',
-        'ENABLE_EFILING': 'true',
-        'OUTPUT_DIR': '/custom/output'
-    })
-    def test_load_configuration_from_environment(self):
-        """Test loading configuration from environment variables"""
-        with patch('src.main.OCRParser'), \
-             patch('src.main.NLPProcessor'), \
-             patch('src.main.DatabaseHandler'), \
-             patch('src.main.EFilingIntegration'):
-            
-            processor = TaxFormProcessor()
-            
-            self.assertEqual(processor.config['database_type'], 'mongodb')
-            self.assertTrue(processor.config['enable_efiling'])
-            self.assertEqual(processor.config['output_directory'], '/custom/output')
+    def test_process_and_file(self):
+        """Test the workflow summary and e-filing of the fileable forms"""
+        self.processor.efiling.submit_form.return_value = {'success': True, 'submission_id': 'SUB_1'}
+        
+        summary = self.processor.process_and_file(self.csv_path, submit_for_filing=True)
+        
+        self.assertEqual(summary['processing_summary']['total_forms'], 3)
+        self.assertEqual(summary['processing_summary']['successful'], 2)
+        self.assertEqual(summary['processing_summary']['errors'], 1)
+        self.assertAlmostEqual(summary['processing_summary']['success_rate'], 66.67, places=1)
+        self.assertEqual(summary['efiling_summary'], {'attempted': 2, 'successful': 2, 'failed': 0})
+        
+        filed = [call.args[0]['form_id'] for call in self.processor.efiling.submit_form.call_args_list]
+        self.assertEqual(sorted(filed), ['1', '3'])
+        self.db_handler.log_processing_batch.assert_called_with(
+            [('1', 'SUBMITTED', None), ('3', 'SUBMITTED', None)])
     
-    def test_get_form_name(self):
-        """Test form name retrieval"""
-        self.assertEqual(self.processor._get_form_name('1040'), 'U.S. Individual Income Tax Return')
-        self.assertEqual(self.processor._get_form_name('W2'), 'Wage and Tax Statement')
-        self.assertEqual(self.processor._get_form_name('Unknown'), 'Form Unknown')
-    
-    def test_extract_tax_year(self):
-        """Test tax year extraction"""
-        # Test explicit tax year
-        data_with_year = {'tax_year': '2023'}
-        self.assertEqual(self.processor._extract_tax_year(data_with_year), 2023)
+    def test_process_single_form(self):
+        """Test that a single form is analyzed and stored"""
+        result = self.processor.process_single_form({'form_id': '7', 'raw_text': _JANE_SMITH_TEXT})
         
-        # Test default to previous year
-        data_without_year = {'name': 'John Doe'}
-        current_year = datetime.now().year
-        self.assertEqual(self.processor._extract_tax_year(data_without_year), current_year - 1)
+        self.assertEqual(result['processing_status'], 'SUCCESS')
+        self.db_handler.insert_form_data.assert_called_once()
+        self.db_handler.log_processing.assert_called_once_with('7', 'SUCCESS')
+
+
+class TestMainCLI(unittest.TestCase):
+    """Test cases for Main CLI functionality"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the CLI entry point once"""
+        from src.main import main
+        cls._main = staticmethod(main)
     
-    def test_process_document_success(self):
-        """Test successful document processing"""
-        # Mock all components
-        mock_ocr_results = [Mock()]
-        mock_ocr_results[0].text = "Form 1040\nName: John Doe\nSSN: 123-45-6789"
-        mock_ocr_results[0].confidence = 0.95
+    def setUp(self):
+        """Patch the processor class and the log file setup for each test"""
+        for target in ('src.main.TaxFormProcessor', 'src.main._configure_logging'):
+            patcher = patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        from src import main as main_module
+        self.processor = main_module.TaxFormProcessor.return_value.__enter__.return_value
+    
+    @patch('os.path.exists', return_value=False)
+    def test_missing_csv(self, mock_exists):
+        """Test that a missing CSV is reported without processing"""
+        with patch('builtins.print') as mock_print:
+            self._main()
         
-        mock_nlp_results = {
-            'form_type': '1040',
-            'entities': [],
-            'structured_data': {
-                'name': 'John Doe',
-                'ssn': '123-45-6789',
-                'filing_status': 'single'
+        self.processor.process_and_file.assert_not_called()
+        mock_print.assert_called_once_with(f"Error: CSV file not found at {os.path.join('data', 'tax_forms.csv')}")
+    
+    @patch('os.path.exists', return_value=True)
+    def test_results_are_reported(self, mock_exists):
+        """Test that the summary and each form's details are written out"""
+        self.processor.process_and_file.return_value = {
+            'processing_summary': {
+                'total_forms': 2,
+                'successful': 1,
+                'warnings': 0,
+                'errors': 1,
+                'success_rate': 50.0
             },
-            'financial_amounts': [],
-            'validation': Mock()
+            'processing_results': [
+                {
+                    'form_id': '1',
+                    'processing_status': 'SUCCESS',
+                    'extracted_fields': {'name': 'John Doe'},
+                    'validation': {'valid': True, 'errors': [], 'warnings': []}
+                },
+                {'form_id': '2', 'processing_status': 'ERROR', 'error': 'Form 2 has no raw_text'}
+            ]
         }
-        mock_nlp_results['validation'].is_valid = True
-        mock_nlp_results['validation'].confidence = 0.9
-        mock_nlp_results['validation'].errors = []
-        mock_nlp_results['validation'].warnings = []
         
-        self.processor.ocr_parser.process_document.return_value = mock_ocr_results
-        self.processor.nlp_processor.process_tax_form_text.return_value = mock_nlp_results
-        self.processor.db_handler.insert_tax_form.return_value = 'FORM_123'
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self._main()
         
-        # Test processing
-        test_file = os.path.join(self.temp_dir, 'test_form.pdf')
-        with open(test_file, 'w') as f:
-            f.write("dummy content")
-        
-        result = self.processor.process_document(test_file)
-        
-        self.assertTrue(result['success'])
-        self.assertEqual(result['form_id'], 'FORM_123')
-        self.assertEqual(result['form_type'], '1040')
-        self.assertTrue(result['validation']['is_valid'])
+        self.processor.process_and_file.assert_called_once_with(os.path.join('data', 'tax_forms.csv'),
+                                                                submit_for_filing=False)
+        output = stdout.getvalue()
+        self.assertIn("Total Forms Processed: 2", output)
+        self.assertIn("Success Rate: 50.0%", output)
+        self.assertIn("  name: John Doe", output)
+        self.assertIn("Error: Form 2 has no raw_text", output)
+
+
+class TestFormAnalyzer(unittest.TestCase):
+    """Test cases for FormAnalyzer against the real regex extraction"""
     
-    def test_process_document_failure(self):
-        """Test document processing failure"""
-        # Mock OCR parser to raise exception
-        self.processor.ocr_parser.process_document.side_effect = Exception("OCR failed")
-        self.processor.db_handler.insert_tax_form.return_value = 'ERROR_FORM_123'
-        
-        test_file = os.path.join(self.temp_dir, 'test_form.pdf')
-        with open(test_file, 'w') as f:
-            f.write("dummy content")
-        
-        result = self.processor.process_document(test_file)
-        
-        self.assertFalse(result['success'])
-        self.assertIn('error', result)
-        self.assertEqual(result['error'], 'OCR failed')
+    @classmethod
+    def setUpClass(cls):
+        """Import the classes under test"""
+        from src.main import FormAnalyzer
+        from src.nlp_processor import NLPProcessor
+        cls.FormAnalyzer = FormAnalyzer
+        cls.NLPProcessor = NLPProcessor
+    
+    def setUp(self):
+        """Build an analyzer; spaCy is only loaded when a test enables it"""
+        self.analyzer = self.FormAnalyzer(self.NLPProcessor(), enable_nlp_analysis=False)
     
-    def test_process_batch(self):
-        """Test batch processing"""
-        # Create test files
-        test_files = []
-        for i in range(3):
-            file_path = os.path.join(self.temp_dir, f'test_form_{i}.pdf')
-            with open(file_path, 'w') as f:
-                f.write(f"dummy content {i}")
-            test_files.append(file_path)
+    def test_analyze_forms_keeps_order_and_reports_errors(self):
+        """Test that results follow input order and a bad form gets an error result"""
+        forms = [
+            {'form_id': '1', 'raw_text': _JOHN_DOE_TEXT},
+            {'form_id': '2'},
+            {'form_id': '3', 'raw_text': _JANE_SMITH_TEXT}
+        ]
         
-        # Mock process_document to return success for all files
-        def mock_process_document(file_path):
-            return {
-                'success': True,
-                'form_id': f'FORM_{os.path.basename(file_path)}',
-                'form_type': '1040',
-                'confidence_score': 0.9
-            }
+        analyzed = self.analyzer.analyze_forms(forms, processed_at='2024-01-01T00:00:00')
         
-        self.processor.process_document = mock_process_document
+        self.assertEqual([result['form_id'] for result, _ in analyzed], ['1', '2', '3'])
+        self.assertEqual([result['processing_status'] for result, _ in analyzed], ['SUCCESS', 'ERROR', 'SUCCESS'])
+        self.assertTrue(all(result['processed_at'] == '2024-01-01T00:00:00' for result, _ in analyzed))
         
-        result = self.processor.process_batch(self.temp_dir, ['*.pdf'])
+        error_result, error_form = analyzed[1]
+        self.assertIsNone(error_form)
+        self.assertIn('error', error_result)
         
-        self.assertEqual(result['total_files'], 3)
-        self.assertEqual(result['successful_count'], 3)
-        self.assertEqual(result['error_count'], 0)
-        self.assertEqual(result['success_rate'], 100.0)
+        result, complete_form = analyzed[0]
+        self.assertEqual(result['extracted_fields']['name'], 'John Doe')
+        self.assertEqual(result['extracted_fields']['wages'], 75000.0)
+        self.assertEqual(complete_form['form_type'], '1040')
+        self.assertEqual(complete_form['ssn'], '123-45-6789')
+        self.assertEqual(complete_form['raw_text'], _JOHN_DOE_TEXT)
+        self.assertEqual(analyzed[2][0]['extracted_fields']['name'], 'Jane Smith')
+    
+    def test_blank_raw_text_is_an_error(self):
+        """Test that empty CSV cells ('' from the readers) are not analyzed as valid forms"""
+        for raw_text in ('', '  \n', float('nan')):
+            with self.subTest(raw_text=raw_text):
+                result, complete_form = self.analyzer.analyze_form({'form_id': '1', 'raw_text': raw_text})
+                
+                self.assertEqual(result['processing_status'], 'ERROR')
+                self.assertIsNone(complete_form)
+    
+    def test_analyze_forms_aligns_batched_spacy_results(self):
+        """Test that each form gets the spaCy result computed for its own text"""
+        analyzer = self.FormAnalyzer(self.NLPProcessor(), enable_nlp_analysis=True)
+        forms = [{'form_id': '1', 'raw_text': _JOHN_DOE_TEXT}, {'form_id': '2', 'raw_text': _JANE_SMITH_TEXT}]
+        
+        with patch.object(analyzer.nlp_processor, 'process_texts_with_spacy',
+                          return_value=[{'person_names': ['John Doe']}, {'person_names': ['Jane Smith']}]) as mock_pipe:
+            analyzed = analyzer.analyze_forms(forms)
+        
+        mock_pipe.assert_called_once()
+        self.assertEqual(mock_pipe.call_args.args[0], [_JOHN_DOE_TEXT, _JANE_SMITH_TEXT])
+        self.assertEqual([result['spacy_analysis']['person_names'] for result, _ in analyzed],
+                         [['John Doe'], ['Jane Smith']])
     
-    def test_process_batch_mixed_results(self):
-        """Test batch processing with mixed success/failure results"""
-        # Create test files
-        for i in range(3):
-            file_path = os.path.join(self.temp_dir, f'test_form_{i}.pdf')
-            with open(file_path, 'w') as f:
-                f.write(f"dummy content {i}")
+    def test_cached_results_are_independent(self):
+        """Test that forms with the same text do not share result dicts"""
+        forms = [{'form_id': '1', 'raw_text': _JOHN_DOE_TEXT}, {'form_id': '2', 'raw_text': _JOHN_DOE_TEXT}]
         
-        # Mock process_document to return mixed results
-        def mock_process_document(file_path):
-            file_name = os.path.basename(file_path)
-            if '0' in file_name:
-                return {'success': False, 'error': 'Processing failed'}
-            else:
-                return {
-                    'success': True,
-                    'form_id': f'FORM_{file_name}',
-                    'form_type': '1040',
-                    'confidence_score': 0.9
-                }
+        with patch.object(self.analyzer.nlp_processor, 'extract_and_validate',
+                          wraps=self.analyzer.nlp_processor.extract_and_validate) as mock_extract:
+            (first, _), (second, _) = self.analyzer.analyze_forms(forms)
         
-        self.processor.process_document = mock_process_document
+        # The second form is served from the cache
+        mock_extract.assert_called_once_with(_JOHN_DOE_TEXT)
         
-        result = self.processor.process_batch(self.temp_dir, ['*.pdf'])
+        first['extracted_fields']['wages'] = 0
+        first['validation']['errors'].append('edited')
+        third, _ = self.analyzer.analyze_form({'form_id': '3', 'raw_text': _JOHN_DOE_TEXT})
         
-        self.assertEqual(result['total_files'], 3)
-        self.assertEqual(result['successful_count'], 2)
-        self.assertEqual(result['error_count'], 1)
-        self.assertAlmostEqual(result['success_rate'], 66.67, places=1)
+        for result in (second, third):
+            self.assertEqual(result['extracted_fields']['wages'], 75000.0)
+            self.assertEqual(result['validation']['errors'], [])
+
+
+class TestStoreForms(unittest.TestCase):
+    """Test cases for the writer threads' batched storage"""
     
-    def test_get_processing_statistics(self):
-        """Test getting processing statistics"""
-        # Mock database statistics
-        mock_db_stats = {
-            'total_forms': 10,
-            'status_distribution': {'processed': 8, 'pending': 2},
-            'form_type_distribution': {'1040': 6, 'W2': 4},
-            'average_confidence': 0.85
-        }
-        
-        self.processor.db_handler.get_processing_statistics.return_value = mock_db_stats
-        
-        stats = self.processor.get_processing_statistics()
-        
-        self.assertIn('database_statistics', stats)
-        self.assertIn('system_info', stats)
-        self.assertEqual(stats['database_statistics']['total_forms'], 10)
-        self.assertEqual(stats['system_info']['processor_version'], '1.0.0')
+    @classmethod
+    def setUpClass(cls):
+        """Import the class under test"""
+        from src.main import TaxFormProcessor
+        # _store_forms only uses its arguments, so no components are built
+        cls.processor = TaxFormProcessor.__new__(TaxFormProcessor)
     
-    def test_get_processing_statistics_with_efiling(self):
-        """Test getting statistics with e-filing enabled"""
-        # Enable e-filing
-        self.processor.efiling_integration = Mock()
-        mock_efiling_history = [
-            {'status': 'transmitted', 'form_type': '1040'},
-            {'status': 'pending', 'form_type': '1040'},
-            {'status': 'transmitted', 'form_type': 'W2'}
+    def setUp(self):
+        """Set up a connected handler mock and two analyzed forms"""
+        self.db_handler = MagicMock()
+        self.db_handler.ensure_connection.return_value = True
+        self.items = [
+            ({'form_id': '1', 'wages': 75000.0}, {'form_id': '1', 'processing_status': 'SUCCESS'}),
+            ({'form_id': '2', 'wages': 'n/a'}, {'form_id': '2', 'processing_status': 'WARNING'})
         ]
-        self.processor.efiling_integration.get_submission_history.return_value = mock_efiling_history
-        
-        # Mock database statistics
-        mock_db_stats = {
-            'total_forms': 5,
-            'status_distribution': {'processed': 5},
-            'form_type_distribution': {'1040': 3, 'W2': 2},
-            'average_confidence': 0.9
-        }
-        self.processor.db_handler.get_processing_statistics.return_value = mock_db_stats
-        
-        stats = self.processor.get_processing_statistics()
-        
-        self.assertIn('efiling_statistics', stats)
-        self.assertEqual(stats['efiling_statistics']['total_submissions'], 3)
-        self.assertEqual(stats['efiling_statistics']['status_distribution']['transmitted'], 2)
-        self.assertEqual(stats['efiling_statistics']['status_distribution']['pending'], 1)
     
-    def test_save_processing_results(self):
-        """Test saving processing results to file"""
-        test_results = {
-            'success': True,
-            'form_id': 'FORM_123',
-            'form_type': '1040',
-            'confidence_score': 0.95
-        }
-        
-        self.processor._save_processing_results(test_results)
+    def test_batch_insert_logs_each_status(self):
+        """Test that a successful batch logs every form's own status"""
+        self.db_handler.insert_forms_batch.return_value = 2
         
-        # Check if file was created
-        output_files = os.listdir(self.temp_dir)
-        result_files = [f for f in output_files if f.startswith('processing_result_')]
+        self.processor._store_forms(self.items, self.db_handler)
         
-        self.assertEqual(len(result_files), 1)
-        
-        # Verify file content
-        with open(os.path.join(self.temp_dir, result_files[0]), 'r') as f:
-            saved_results = json.load(f)
-        
-        self.assertEqual(saved_results['form_id'], 'FORM_123')
-        self.assertEqual(saved_results['form_type'], '1040')
+        self.db_handler.insert_forms_batch.assert_called_once()
+        self.db_handler.insert_form_data.assert_not_called()
+        self.db_handler.log_processing_batch.assert_called_once_with(
+            [('1', 'SUCCESS', None), ('2', 'WARNING', None)])
     
-    def test_save_batch_results(self):
-        """Test saving batch processing results to file"""
-        test_batch_results = {
-            'batch_id': 'BATCH_20240101_120000',
-            'total_files': 5,
-            'successful_count': 4,
-            'error_count': 1
-        }
-        
-        self.processor._save_batch_results(test_batch_results)
+    def test_failed_batch_is_retried_per_form(self):
+        """Test that one bad row only fails its own form"""
+        self.db_handler.insert_forms_batch.return_value = None
+        self.db_handler.insert_form_data.side_effect = [11, None]
         
-        # Check if file was created
-        output_files = os.listdir(self.temp_dir)
-        batch_files = [f for f in output_files if f.startswith('batch_result_')]
+        self.processor._store_forms(self.items, self.db_handler)
         
-        self.assertEqual(len(batch_files), 1)
-        
-        # Verify file content
-        with open(os.path.join(self.temp_dir, batch_files[0]), 'r') as f:
-            saved_results = json.load(f)
-        
-        self.assertEqual(saved_results['batch_id'], 'BATCH_20240101_120000')
-        self.assertEqual(saved_results['total_files'], 5)
-
-
-class TestMainCLI(unittest.TestCase):
-    """Test cases for Main CLI functionality"""
+        self.assertEqual([call.args[0]['form_id'] for call in self.db_handler.insert_form_data.call_args_list],
+                         ['1', '2'])
+        self.db_handler.log_processing_batch.assert_called_once_with(
+            [('1', 'SUCCESS', None), ('2', 'ERROR', 'Failed to insert data')])
     
-    @patch('src.main.TaxFormProcessor')
-    @patch('sys.argv', ['main.py', '--stats'])
-    def test_cli_stats_command(self, mock_processor_class):
-        """Test CLI stats command"""
-        mock_processor = Mock()
-        mock_stats = {
-            'database_statistics': {'total_forms': 10},
-            'system_info': {'processor_version': '1.0.0'}
-        }
-        mock_processor.get_processing_statistics.return_value = mock_stats
-        mock_processor_class.return_value = mock_processor
+    def test_no_connection_skips_storage(self):
+        """Test that nothing is written without a database connection"""
+        self.db_handler.ensure_connection.return_value = False
         
-        with patch('builtins.print') as mock_print:
-            from src.main import main
-            main()
-            
-            # Verify stats were printed
-            mock_print.assert_called()
-            printed_output = mock_print.call_args[0][0]
-            self.assertIn('total_forms', printed_output)
-    
-    @patch('src.main.TaxFormProcessor')
-    @patch('os.path.exists', return_value=True)
-    @patch('sys.argv', ['main.py', '--file', 'test.pdf'])
-    def test_cli_file_command(self, mock_exists, mock_processor_class):
-        """Test CLI single file processing command"""
-        mock_processor = Mock()
-        mock_result = {
-            'success': True,
-            'form_id': 'FORM_123',
-            'form_type': '1040'
-        }
-        mock_processor.process_document.return_value = mock_result
-        mock_processor_class.return_value = mock_processor
-        
-        with patch('builtins.print') as mock_print:
-            from src.main import main
-            main()
-            
-            # Verify file was processed
-            mock_processor.process_document.assert_called_once_with('test.pdf', None)
-            mock_print.assert_called()
-    
-    @patch('src.main.TaxFormProcessor')
-    @patch('os.path.exists', return_value=True)
-    @patch('sys.argv', ['main.py', '--directory', '/test/dir'])
-    def test_cli_directory_command(self, mock_exists, mock_processor_class):
-        """Test CLI directory processing command"""
-        mock_processor = Mock()
-        mock_batch_result = {
-            'successful_count': 5,
-            'total_files': 6,
-            'error_count': 1
-        }
-        mock_processor.process_batch.return_value = mock_batch_result
-        mock_processor_class.return_value = mock_processor
+        self.processor._store_forms(self.items, self.db_handler)
         
-        with patch('builtins.print') as mock_print:
-            from src.main import main
-            main()
-            
-            # Verify batch processing was called
-            mock_processor.process_batch.assert_called_once_with('/test/dir')
-            mock_print.assert_called()
+        self.db_handler.insert_forms_batch.assert_not_called()
+        self.db_handler.log_processing_batch.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -5,135 +5,240 @@ Test module for OCR Parser functionality
 import unittest
 import tempfile
 import os
-from unittest.mock import patch, Mock, MagicMock
-import numpy as np
-from PIL import Image
-import cv2
+from unittest.mock import patch, MagicMock
 
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# src.ocr_parser pulls in heavy dependencies, so it is imported on first use
+# rather than when pytest collects this module
+OCRParser = None
 
-from src.ocr_parser import OCRParser, OCRResult
 
+def _import_src():
+    """Bind the class under test from src.ocr_parser"""
+    global OCRParser
+    from src.ocr_parser import OCRParser
 
-class TestOCRParser(unittest.TestCase):
-    """Test cases for OCR Parser"""
+
+class TestExtractFromPDF(unittest.TestCase):
+    """Test cases for embedded-text reading and OCR of PDF pages"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        _import_src()
+        from src import ocr_parser
+        cls.ocr_parser = ocr_parser
     
     def setUp(self):
-        """Set up test fixtures"""
+        """Create a placeholder PDF; pdfplumber, Poppler and Tesseract are patched"""
         self.parser = OCRParser()
         
-        # Create a temporary test image
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_image_path = os.path.join(self.temp_dir, 'test_form.png')
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.pdf_path = os.path.join(temp_dir.name, 'form.pdf')
+        with open(self.pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4')
+        
+        patchers = {
+            'open_pdf': patch('src.ocr_parser.pdfplumber.open'),
+            'convert': patch('src.ocr_parser.convert_from_path', side_effect=self._fake_convert),
+            'pdfinfo': patch('src.ocr_parser.pdfinfo_from_path'),
+            'save': patch.object(self.parser, '_save_pages', side_effect=self._fake_save),
+            'ocr': patch.object(self.parser, 'extract_from_images',
+                                side_effect=lambda paths: [f"ocr {path}" for path in paths])
+        }
+        self.mocks = {name: patcher.start() for name, patcher in patchers.items()}
+        for patcher in patchers.values():
+            self.addCleanup(patcher.stop)
+    
+    @staticmethod
+    def _fake_convert(pdf_path, first_page, last_page, **kwargs):
+        """Render one placeholder image per requested (one-based) page"""
+        return [f"image {page}" for page in range(first_page, last_page + 1)]
+    
+    @staticmethod
+    def _fake_save(indexed_pages, tmpdir):
+        """Name each saved page after its zero-based index"""
+        return [f"page_{i}" for i, _ in indexed_pages]
+    
+    def _set_page_texts(self, texts):
+        """Make pdfplumber report the given embedded text for each page"""
+        pages = [MagicMock(**{'extract_text.return_value': text}) for text in texts]
+        self.mocks['open_pdf'].return_value.__enter__.return_value.pages = pages
+    
+    def test_embedded_text_skips_ocr(self):
+        """Test that pages with a text layer are neither rasterized nor OCR'd"""
+        self._set_page_texts(["Form 1040\n", "Name: John Doe"])
+        
+        raw_text = self.parser.extract_from_pdf(self.pdf_path)
+        
+        self.assertEqual(raw_text, "Form 1040\n\nName: John Doe")
+        self.mocks['convert'].assert_not_called()
+        self.mocks['ocr'].assert_not_called()
+    
+    def test_only_pages_without_text_are_converted(self):
+        """Test that each run of text-less pages is converted on its own"""
+        self._set_page_texts(["first", None, "  ", "fourth", ""])
+        
+        raw_text = self.parser.extract_from_pdf(self.pdf_path, page_workers=1)
+        
+        self.assertEqual(raw_text, "first\n\nocr page_1\n\nocr page_2\n\nfourth\n\nocr page_4")
+        self.assertEqual([(call.kwargs['first_page'], call.kwargs['last_page'])
+                          for call in self.mocks['convert'].call_args_list], [(2, 3), (5, 5)])
+        self.assertTrue(all(call.kwargs['grayscale'] for call in self.mocks['convert'].call_args_list))
+        self.mocks['pdfinfo'].assert_not_called()
+    
+    def test_unreadable_pdf_falls_back_to_ocr(self):
+        """Test that a PDF pdfplumber cannot open is OCR'd page by page"""
+        self.mocks['open_pdf'].side_effect = ValueError("broken xref table")
+        self.mocks['pdfinfo'].return_value = {'Pages': 2}
+        
+        raw_text = self.parser.extract_from_pdf(self.pdf_path, page_workers=1)
+        
+        self.assertEqual(raw_text, "ocr page_0\n\nocr page_1")
+        self.mocks['convert'].assert_called_once()
+        self.assertEqual(self.mocks['convert'].call_args.kwargs['first_page'], 1)
+        self.assertEqual(self.mocks['convert'].call_args.kwargs['last_page'], 2)
+    
+    def test_missing_pdf_raises(self):
+        """Test that a missing PDF raises FileNotFoundError before any parsing"""
+        with self.assertRaises(FileNotFoundError):
+            self.parser.extract_from_pdf(self.pdf_path + '.missing')
+        
+        self.mocks['open_pdf'].assert_not_called()
+    
+    @patch('src.ocr_parser.ProcessPoolExecutor')
+    def test_concurrent_batches_run_in_worker_processes(self, mock_pool):
+        """Test that concurrent OCR runs in limited workers, not in this process"""
+        self._set_page_texts(["", "", "third"])
+        executor = mock_pool.return_value.__enter__.return_value
+        executor.map.side_effect = lambda fn, path_batches: [[f"worker {path}" for path in paths]
+                                                             for paths in path_batches]
+        environ = dict(os.environ)
+        
+        raw_text = self.parser.extract_from_pdf(self.pdf_path, page_workers=4)
+        
+        self.assertEqual(raw_text, "worker page_0\n\nworker page_1\n\nthird")
+        mock_pool.assert_called_once_with(max_workers=2, initializer=self.ocr_parser._init_pdf_worker)
+        self.assertIs(executor.map.call_args.args[0], self.ocr_parser._extract_images_in_worker)
+        self.mocks['ocr'].assert_not_called()
+        self.assertEqual(dict(os.environ), environ)
+
+
+class TestOCRParserCSV(unittest.TestCase):
+    """Test cases for reading the shipped tax_forms.csv"""
+    
+    CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'tax_forms.csv')
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        from src import ocr_parser
+        cls.ocr_parser = ocr_parser
+        cls.parser = ocr_parser.OCRParser()
+    
+    def test_iter_csv_keeps_multiline_raw_text(self):
+        """Test that quoted raw_text values keep their newlines"""
+        forms = list(self.parser.iter_csv(self.CSV_PATH))
+        
+        self.assertEqual([form['form_id'] for form in forms], ['1', '2', '3', '4', '5'])
+        self.assertEqual(forms[0]['raw_text'],
+                         "Form 1040\nName: John Doe\nSSN: 123-45-6789\nWages: 75000\nFiling Status: Single")
+    
+    def test_read_csv_matches_iter_csv(self):
+        """Test that read_csv returns the same forms as the streaming reader"""
+        self.assertEqual(self.parser.read_csv(self.CSV_PATH), list(self.parser.iter_csv(self.CSV_PATH)))
+    
+    def test_arrow_reader_matches_pandas_reader(self):
+        """Test that the pyarrow and pandas readers agree on the shipped file"""
+        if self.ocr_parser.pacsv is None:
+            self.skipTest("pyarrow is not installed")
+        
+        self.assertEqual(self.parser._read_csv_arrow(self.CSV_PATH),
+                         list(self.parser.iter_csv(self.CSV_PATH)))
+    
+    def test_read_csv_falls_back_to_pandas(self):
+        """Test that read_csv uses pandas when pyarrow cannot parse the file"""
+        if self.ocr_parser.pacsv is None:
+            self.skipTest("pyarrow is not installed")
+        
+        with patch.object(self.parser, '_read_csv_arrow',
+                          side_effect=self.ocr_parser.pa.ArrowInvalid("CSV parse error")):
+            forms = self.parser.read_csv(self.CSV_PATH)
         
-        # Create a simple test image with text
-        img = Image.new('RGB', (800, 600), color='white')
-        img.save(self.test_image_path)
+        self.assertEqual(forms, list(self.parser.iter_csv(self.CSV_PATH)))
+    
+    def test_read_csv_missing_file(self):
+        """Test that a missing CSV file raises FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            self.parser.read_csv(os.path.join(tempfile.gettempdir(), 'missing_tax_forms.csv'))
+
+
+class TestExtractFromImages(unittest.TestCase):
+    """Test cases for batched Tesseract runs over several images"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test"""
+        from src import ocr_parser
+        cls.parser = ocr_parser.OCRParser()
+    
+    def setUp(self):
+        """Create placeholder page images; Tesseract itself is patched"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_paths = []
+        for i in range(3):
+            image_path = os.path.join(self.temp_dir.name, f'page_{i}.bmp')
+            with open(image_path, 'wb') as f:
+                f.write(b'BM')
+            self.image_paths.append(image_path)
     
     def tearDown(self):
         """Clean up test fixtures"""
-        if os.path.exists(self.test_image_path):
-            os.remove(self.test_image_path)
-        os.rmdir(self.temp_dir)
-    
-    def test_initialization(self):
-        """Test OCR Parser initialization"""
-        parser = OCRParser()
-        self.assertIsInstance(parser, OCRParser)
-        self.assertIn('1040', parser.form_patterns)
-        self.assertIn('W2', parser.form_patterns)
-    
-    def test_preprocess_image(self):
-        """Test image preprocessing"""
-        processed_image = self.parser.preprocess_image(self.test_image_path)
-        self.assertIsInstance(processed_image, np.ndarray)
-        self.assertEqual(len(processed_image.shape), 2)  # Should be grayscale
-    
-    @patch('pytesseract.image_to_data')
-    @patch('pytesseract.image_to_string')
-    def test_extract_text_from_image(self, mock_string, mock_data):
-        """Test text extraction from image"""
-        # Mock pytesseract responses
-        mock_data.return_value = {
-            'text': ['Form', '1040', 'John', 'Doe'],
-            'conf': [95, 90, 85, 88],
-            'left': [10, 50, 100, 150],
-            'top': [10, 10, 50, 50],
-            'width': [40, 40, 40, 40],
-            'height': [20, 20, 20, 20]
-        }
-        mock_string.return_value = "Form 1040\nJohn Doe"
-        
-        result = self.parser.extract_text_from_image(self.test_image_path)
-        
-        self.assertIsInstance(result, OCRResult)
-        self.assertEqual(result.text, "Form 1040\nJohn Doe")
-        self.assertGreater(result.confidence, 0)
-        self.assertGreater(len(result.bounding_boxes), 0)
-    
-    def test_identify_form_type(self):
-        """Test form type identification"""
-        # Test 1040 identification
-        text_1040 = "Form 1040 U.S. Individual Income Tax Return"
-        self.assertEqual(self.parser.identify_form_type(text_1040), '1040')
-        
-        # Test W2 identification
-        text_w2 = "Form W-2 Wage and Tax Statement"
-        self.assertEqual(self.parser.identify_form_type(text_w2), 'W2')
-        
-        # Test unknown form
-        text_unknown = "Some random text"
-        self.assertEqual(self.parser.identify_form_type(text_unknown), 'Unknown')
-    
-    def test_extract_structured_data(self):
-        """Test structured data extraction"""
-        # Create mock OCR result
-        ocr_result = OCRResult(
-            text="Form 1040\nName: John Doe\nSocial security number: 123-45-6789",
-            confidence=0.9,
-            bounding_boxes=[]
-        )
-        
-        result = self.parser.extract_structured_data(ocr_result)
-        
-        self.assertEqual(result.form_type, '1040')
-        self.assertIsInstance(result.extracted_fields, dict)
-    
-    @patch('src.ocr_parser.pdf2image.convert_from_path')
-    def test_extract_text_from_pdf(self, mock_convert):
-        """Test PDF text extraction"""
-        # Mock PDF conversion
-        mock_image = Mock()
-        mock_convert.return_value = [mock_image]
-        
-        with patch.object(self.parser, 'extract_text_from_image') as mock_extract:
-            mock_extract.return_value = OCRResult("Test text", 0.9, [])
-            
-            # Create a temporary PDF path
-            pdf_path = os.path.join(self.temp_dir, 'test.pdf')
-            with open(pdf_path, 'w') as f:
-                f.write("dummy pdf content")
-            
-            try:
-                results = self.parser.extract_text_from_pdf(pdf_path)
-                self.assertIsInstance(results, list)
-                self.assertEqual(len(results), 1)
-            finally:
-                if os.path.exists(pdf_path):
-                    os.remove(pdf_path)
-    
-    def test_process_document_unsupported_format(self):
-        """Test processing unsupported file format"""
-        unsupported_file = os.path.join(self.temp_dir, 'test.txt')
-        with open(unsupported_file, 'w') as f:
-            f.write("test content")
-        
-        try:
-            with self.assertRaises(ValueError):
-                self.parser.process_document(unsupported_file)
-        finally:
-            os.remove(unsupported_file)
+        self.temp_dir.cleanup()
+    
+    @patch('src.ocr_parser.pytesseract.image_to_string')
+    def test_output_is_split_per_image(self, mock_ocr):
+        """Test that form feeds split one Tesseract run into per-image text"""
+        listed = []
+        
+        def fake_ocr(list_path):
+            with open(list_path) as f:
+                listed.extend(f.read().splitlines())
+            return "Form 1040\nName: John Doe\n\fPage two\n\f  Page three  \n\f"
+        
+        mock_ocr.side_effect = fake_ocr
+        
+        result = self.parser.extract_from_images(self.image_paths)
+        
+        self.assertEqual(result, ["Form 1040\nName: John Doe", "Page two", "Page three"])
+        mock_ocr.assert_called_once()
+        self.assertEqual(listed, [os.path.abspath(path) for path in self.image_paths])
+        # The list file is removed after the run
+        self.assertFalse(os.path.exists(mock_ocr.call_args.args[0]))
+    
+    @patch('src.ocr_parser.pytesseract.image_to_string')
+    def test_missing_pages_are_padded(self, mock_ocr):
+        """Test that images Tesseract produced no page for get empty text"""
+        mock_ocr.return_value = "Only page"
+        
+        result = self.parser.extract_from_images(self.image_paths)
+        
+        self.assertEqual(result, ["Only page", "", ""])
+    
+    @patch('src.ocr_parser.pytesseract.image_to_string')
+    def test_missing_image_raises(self, mock_ocr):
+        """Test that a missing image fails before Tesseract runs"""
+        with self.assertRaises(FileNotFoundError):
+            self.parser.extract_from_images(self.image_paths + [os.path.join(self.temp_dir.name, 'missing.bmp')])
+        
+        mock_ocr.assert_not_called()
+    
+    @patch('src.ocr_parser.pytesseract.image_to_string')
+    def test_no_images(self, mock_ocr):
+        """Test that an empty batch skips Tesseract"""
+        self.assertEqual(self.parser.extract_from_images([]), [])
+        mock_ocr.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+"""
+Test module for the visualization demo's aggregation helpers
+"""
+
+import unittest
+from unittest.mock import patch
+
+
+class TestCategoryMeans(unittest.TestCase):
+    """Test cases for the bincount-based group aggregation"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test (selects the off-screen Agg backend)"""
+        import pandas as pd
+        import visualization_demo
+        cls.pd = pd
+        cls.demo = visualization_demo
+    
+    def test_matches_groupby(self):
+        """Test that means and counts match a pandas groupby over observed categories"""
+        df = self.demo.create_sample_data()
+        
+        means, counts = self.demo.category_means(df['state'], df['wages'])
+        grouped = df.groupby('state', observed=True)['wages'].agg(['mean', 'size'])
+        
+        self.assertEqual(list(means.index), list(grouped.index))
+        self.assertEqual(means.index.name, 'state')
+        for state in grouped.index:
+            self.assertAlmostEqual(means[state], grouped.loc[state, 'mean'])
+            self.assertEqual(counts[state], grouped.loc[state, 'size'])
+    
+    def test_skips_unused_categories_and_missing_labels(self):
+        """Test that empty categories and missing labels are left out"""
+        states = self.pd.Series(['IL', None, 'CA', 'IL'], dtype=self.pd.CategoricalDtype(['CA', 'IL', 'NY']))
+        
+        means, counts = self.demo.category_means(states, [100.0, 1000.0, 300.0, 200.0])
+        
+        self.assertEqual(list(means.index), ['CA', 'IL'])
+        self.assertEqual(list(means), [300.0, 150.0])
+        self.assertEqual(list(counts), [1, 2])
+
+
+class TestGroupValues(unittest.TestCase):
+    """Test cases for splitting a column into per-group arrays"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test (selects the off-screen Agg backend)"""
+        import visualization_demo
+        cls.demo = visualization_demo
+    
+    def setUp(self):
+        """Build the categorical sample data the charts use"""
+        self.df = self.demo.create_sample_data()
+    
+    def test_default_order_is_first_seen(self):
+        """Test that groups follow their first appearance, not category order"""
+        labels, groups = self.demo.group_values(self.df, 'refund_amount', 'filing_status')
+        
+        self.assertEqual(labels, ['Single', 'Married Filing Jointly', 'Head of Household',
+                                  'Married Filing Separately'])
+        self.assertEqual(list(groups[0]), [1200, 1100, 1300, 1150])
+        self.assertEqual(list(groups[3]), [1050])
+    
+    def test_explicit_order(self):
+        """Test that an explicit order is kept and selects the matching groups"""
+        labels, groups = self.demo.group_values(self.df, 'wages', 'state', ['NY', 'IL'])
+        
+        self.assertEqual(labels, ['NY', 'IL'])
+        self.assertEqual([list(values) for values in groups], [[89000, 63000], [75000, 95000, 68500]])
+
+
+
+class TestKernels(unittest.TestCase):
+    """Test cases for the NumPy and numba tax-rate and trend-line kernels"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the module under test (selects the off-screen Agg backend)"""
+        import numpy as np
+        import visualization_demo
+        cls.np = np
+        cls.demo = visualization_demo
+    
+    def test_small_inputs_use_numpy(self):
+        """Test that inputs below JIT_MIN_ROWS never call the compiled kernels"""
+        wages = self.np.array([50000.0, 0.0])
+        
+        with patch.object(self.demo, '_tax_rates_jit') as mock_jit:
+            rates = self.demo.tax_rates(wages, self.np.array([5000.0, 100.0]))
+        
+        mock_jit.assert_not_called()
+        self.assertEqual(rates[0], 10.0)
+        self.assertEqual(rates[1], self.np.inf)
+    
+    def test_jit_matches_numpy(self):
+        """Test that the compiled kernels agree with NumPy, zero wages included"""
+        if self.demo.njit is None:
+            self.skipTest("numba is not installed")
+        
+        wages = self.np.array([75000.0, 0.0, 68500.0, 0.0])
+        withheld = self.np.array([8500.0, 100.0, 7200.0, 0.0])
+        x = self.np.array([1.0, 2.0, 3.0, 4.0])
+        y = self.np.array([3.0, 5.0, 7.0, 9.0])
+        
+        expected_rates = self.demo.tax_rates(wages, withheld)
+        expected_line = self.demo.trend_line(x, y)
+        with patch.object(self.demo, 'JIT_MIN_ROWS', 0):
+            rates = self.demo.tax_rates(wages, withheld)
+            line = self.demo.trend_line(x, y)
+        
+        self.np.testing.assert_allclose(rates, expected_rates)
+        self.np.testing.assert_allclose(line, expected_line)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,17 +4,93 @@ IRS Tax Form Parser - Data Visualization Demo
 Creates comprehensive charts and graphs for tax form analysis
 """
 
+import io
+import os
+import matplotlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Render off-screen unless an interactive session is requested; Agg skips
+# the GUI event loop and figure-manager setup for every chart
+INTERACTIVE = os.environ.get('INTERACTIVE', '').lower() in ('1', 'true', 'yes')
+if not INTERACTIVE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style for professional plots
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# fast-histogram is optional; np.histogram is used without it
+try:
+    from fast_histogram import histogram1d
+except ImportError:
+    histogram1d = None
+
+# numba is optional; the NumPy kernels below are used without it
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Screen-resolution PNGs by default; set VIZ_DPI=300 for print output
+DPI = int(os.environ.get('VIZ_DPI', '150'))
+# libpng level 1 encodes several times faster than the default 6 for a
+# slightly larger file
+PNG_OPTIONS = {'compress_level': 1}
+
+# Merge nearly collinear segments of long lines before they are rendered
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+
+# Line series longer than this are drawn as a per-pixel min/max envelope
+LINE_ENVELOPE_POINTS = 100_000
+
+def init_style():
+    """
+    Set the style for professional plots
+    
+    Seaborn is only needed for the palette, so it is imported here rather
+    than when the module is loaded.
+    """
+    import seaborn as sns
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+
+def show_or_close(fig):
+    """Show the figure interactively, or release it once it has been saved"""
+    if INTERACTIVE:
+        plt.show()
+    else:
+        plt.close(fig)
+
+def chart_figure(fig=None, figsize=(15, 6)):
+    """
+    Return a figure for a two-panel chart and whether the caller owns it
+    
+    A figure passed in is cleared and resized for reuse; otherwise a new one
+    is created and the caller closes it when done.
+    """
+    if fig is None:
+        return plt.figure(figsize=figsize, layout='constrained'), True
+    fig.clf()
+    fig.set_size_inches(figsize)
+    fig.set_layout_engine('constrained')
+    return fig, False
+
+def save_png(fig, filename):
+    """
+    Render a figure once and write it to filename as a PNG
+    
+    The layout engine has already fitted the figure, so the tight bounding
+    box pass, which renders the figure a second time, is skipped; the encoded
+    image is written with a single call.
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=DPI, pil_kwargs=PNG_OPTIONS)
+    with open(filename, 'wb') as f:
+        f.write(buffer.getbuffer())
 
 def create_sample_data():
     """Create comprehensive sample tax data for visualization"""
@@ -35,16 +111,175 @@ def create_sample_data():
         'processing_time': [1.2, 1.8, 1.1, 1.5, 2.1, 1.0, 1.4, 1.9, 1.3, 1.7]
     }
     
-    return pd.DataFrame(tax_data)
+    df = pd.DataFrame(tax_data)
+    
+    # Compact dtypes: narrow numbers, and categorical codes for repeated labels
+    df = df.astype({
+        'wages': np.int32,
+        'federal_tax_withheld': np.int32,
+        'refund_amount': np.int32,
+        'tax_year': np.int16,
+        'processing_time': np.float32,
+        'form_id': 'category',
+        'filing_status': 'category',
+        'state': 'category'
+    })
+    
+    return df
+
+def column_array(df, column):
+    """Return a column as a contiguous float32 array for plotting"""
+    return np.ascontiguousarray(df[column].to_numpy(), dtype=np.float32)
+
+def group_values(df, column, by, order=None):
+    """Split a column into one array per group, in order or first-seen order"""
+    groups = {key: values.to_numpy() for key, values in df.groupby(by, observed=True)[column]}
+    if order is None:
+        # groupby sorts categorical keys, so take the order of appearance from
+        # the column itself, as seaborn does for an unordered x
+        order = df[by].dropna().unique()
+    return list(order), [groups[key] for key in order]
+
+def draw_histogram(ax, values, bins, **bar_kwargs):
+    """Bin values into equal-width bins and draw them as bars on ax"""
+    values = np.asarray(values, dtype=np.float64)
+    if histogram1d is None:
+        counts, edges = np.histogram(values, bins=bins)
+    else:
+        low, high = values.min(), values.max()
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        # histogram1d excludes the upper edge; nudge it so the maximum counts
+        counts = histogram1d(values, bins=bins, range=(low, np.nextafter(high, np.inf)))
+    return ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **bar_kwargs)
+
+def plot_series(ax, x, y, **line_kwargs):
+    """
+    Plot y against sorted x as a rasterized line
+    
+    Past LINE_ENVELOPE_POINTS the series is reduced to the min and max of y
+    in each pixel column of the axes and filled between them, which looks the
+    same at that density with far fewer segments.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.size <= LINE_ENVELOPE_POINTS:
+        return ax.plot(x, y, rasterized=True, **line_kwargs)
+    
+    columns = max(1, int(ax.bbox.width))
+    edges = np.linspace(x[0], x[-1], columns + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1]))
+    return ax.fill_between(x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts),
+                           color=line_kwargs.get('color'), linewidth=0, rasterized=True)
+
+# Rows below which the NumPy kernels are used even when numba is installed;
+# on inputs this small a compiled call saves less than loading or compiling
+# it costs
+JIT_MIN_ROWS = 10_000
+
+if njit is not None:
+    # Single-pass compiled kernels; cache=True keeps the compiled code on
+    # disk so repeated runs skip the JIT step, and the numpy error model
+    # gives inf/nan on division by zero as the NumPy kernels do
+    @njit(cache=True, error_model='numpy')
+    def _tax_rates_jit(wages, withheld):
+        """Return withheld tax as a percentage of wages for each row"""
+        rate = np.empty(wages.size)
+        for i in range(wages.size):
+            rate[i] = withheld[i] / wages[i] * 100.0
+        return rate
+    
+    @njit(cache=True, error_model='numpy')
+    def _trend_line_jit(x, y):
+        """Return the slope and intercept of the least-squares line through x, y"""
+        n = x.size
+        sx = sy = sxx = sxy = 0.0
+        for i in range(n):
+            sx += x[i]
+            sy += y[i]
+            sxx += x[i] * x[i]
+            sxy += x[i] * y[i]
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        return slope, (sy - slope * sx) / n
+else:
+    _tax_rates_jit = _trend_line_jit = None
+
+def tax_rates(wages, withheld):
+    """Return withheld tax as a percentage of wages for each row"""
+    if _tax_rates_jit is not None and wages.size >= JIT_MIN_ROWS:
+        return _tax_rates_jit(wages, withheld)
+    # One divide and an in-place scale on the raw arrays
+    rate = np.divide(withheld, wages)
+    np.multiply(rate, 100.0, out=rate)
+    return rate
 
-def create_wages_distribution(df):
+def trend_line(x, y):
+    """Return the slope and intercept of the least-squares line through x, y"""
+    if _trend_line_jit is not None and x.size >= JIT_MIN_ROWS:
+        return _trend_line_jit(x, y)
+    slope, intercept = np.linalg.lstsq(np.column_stack([x, np.ones_like(x)]), y, rcond=None)[0]
+    return slope, intercept
+
+def _ensure_tax_rate(df):
+    """Add the effective_tax_rate column unless it is already present"""
+    if 'effective_tax_rate' not in df.columns:
+        df['effective_tax_rate'] = tax_rates(df['wages'].to_numpy(dtype=np.float64),
+                                             df['federal_tax_withheld'].to_numpy(dtype=np.float64))
+
+def category_means(categories, values):
+    """
+    Return the mean of values and the row count for each observed category
+    
+    Both come from np.bincount over the categorical codes, a single typed
+    pass with no per-group objects.
+    """
+    codes = categories.cat.codes.to_numpy(dtype=np.intp)
+    values = np.asarray(values, dtype=np.float64)
+    # Missing labels have code -1 and belong to no category
+    present = codes >= 0
+    codes, values = codes[present], values[present]
+    
+    n_categories = len(categories.cat.categories)
+    counts = np.bincount(codes, minlength=n_categories)
+    sums = np.bincount(codes, weights=values, minlength=n_categories)
+    
+    observed = counts > 0
+    index = categories.cat.categories[observed].rename(categories.name)
+    return (pd.Series(sums[observed] / counts[observed], index=index),
+            pd.Series(counts[observed], index=index))
+
+def summarize_data(df):
+    """Compute the derived column and group aggregates shared by the charts"""
+    _ensure_tax_rate(df)
+    
+    filing_tax_rate, filing_counts = category_means(df['filing_status'], df['effective_tax_rate'])
+    state_wages, state_counts = category_means(df['state'], df['wages'])
+    # Medians have no bincount form, so they still go through groupby
+    filing_wages_median = df.groupby('filing_status', observed=True)['wages'].median()
+    
+    return {
+        'filing_wages_median': filing_wages_median,
+        'filing_tax_rate': filing_tax_rate,
+        'filing_counts': filing_counts.sort_values(ascending=False),
+        'state_wages': state_wages,
+        'state_counts': state_counts.sort_values(ascending=False)
+    }
+
+def create_wages_distribution(df, summary=None, fig=None):
     """Create wages distribution visualization"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig, owned = chart_figure(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+    
+    # Each statistic is reduced once and reused for the line and its label
+    wages = df['wages'].to_numpy(dtype=np.float64)
+    mean_wages = wages.mean()
+    median_wages = np.median(wages)
     
     # Histogram with KDE
-    ax1.hist(df['wages'], bins=8, alpha=0.7, color='skyblue', edgecolor='black')
-    ax1.axvline(df['wages'].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: ${df["wages"].mean():,.0f}')
-    ax1.axvline(df['wages'].median(), color='green', linestyle='--', linewidth=2, label=f'Median: ${df["wages"].median():,.0f}')
+    draw_histogram(ax1, wages, bins=8, alpha=0.7, color='skyblue', edgecolor='black')
+    ax1.axvline(mean_wages, color='red', linestyle='--', linewidth=2, label=f'Mean: ${mean_wages:,.0f}')
+    ax1.axvline(median_wages, color='green', linestyle='--', linewidth=2, label=f'Median: ${median_wages:,.0f}')
     ax1.set_xlabel('Annual Wages ($)')
     ax1.set_ylabel('Number of Taxpayers')
     ax1.set_title('Distribution of Annual Wages')
@@ -52,27 +287,37 @@ def create_wages_distribution(df):
     ax1.grid(True, alpha=0.3)
     
     # Box plot by filing status
-    filing_order = df.groupby('filing_status')['wages'].median().sort_values(ascending=False).index
-    sns.boxplot(data=df, y='filing_status', x='wages', order=filing_order, ax=ax2)
+    if summary is None:
+        summary = summarize_data(df)
+    filing_order = summary['filing_wages_median'].sort_values(ascending=False).index
+    labels, wages_by_status = group_values(df, 'wages', 'filing_status', filing_order)
+    ax2.boxplot(wages_by_status, vert=False, patch_artist=True)
+    ax2.set_yticks(range(1, len(labels) + 1))
+    ax2.set_yticklabels(labels)
+    # Highest median on top
+    ax2.invert_yaxis()
     ax2.set_xlabel('Annual Wages ($)')
     ax2.set_ylabel('Filing Status')
     ax2.set_title('Wages Distribution by Filing Status')
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('wages_distribution.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'wages_distribution.png')
+    if owned:
+        show_or_close(fig)
 
-def create_tax_analysis(df):
+def create_tax_analysis(df, summary=None, fig=None):
     """Create tax withholding analysis"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig, owned = chart_figure(fig)
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Tax rate calculation
-    df['effective_tax_rate'] = (df['federal_tax_withheld'] / df['wages']) * 100
+    _ensure_tax_rate(df)
+    if summary is None:
+        summary = summarize_data(df)
     
     # Scatter plot: Wages vs Tax Withheld
-    scatter = ax1.scatter(df['wages'], df['federal_tax_withheld'], 
-                         c=df['effective_tax_rate'], cmap='viridis', 
+    scatter = ax1.scatter(column_array(df, 'wages'), column_array(df, 'federal_tax_withheld'),
+                         c=column_array(df, 'effective_tax_rate'), cmap='viridis', 
                          s=100, alpha=0.7, edgecolors='black')
     ax1.set_xlabel('Annual Wages ($)')
     ax1.set_ylabel('Federal Tax Withheld ($)')
@@ -80,11 +325,11 @@ def create_tax_analysis(df):
     ax1.grid(True, alpha=0.3)
     
     # Add colorbar
-    cbar = plt.colorbar(scatter, ax=ax1)
+    cbar = fig.colorbar(scatter, ax=ax1)
     cbar.set_label('Effective Tax Rate (%)')
     
     # Tax rate by filing status
-    avg_tax_rate = df.groupby('filing_status')['effective_tax_rate'].mean().sort_values(ascending=True)
+    avg_tax_rate = summary['filing_tax_rate'].sort_values(ascending=True)
     bars = ax2.bar(range(len(avg_tax_rate)), avg_tax_rate.values, color='lightcoral')
     ax2.set_xlabel('Filing Status')
     ax2.set_ylabel('Average Effective Tax Rate (%)')
@@ -94,28 +339,29 @@ def create_tax_analysis(df):
     ax2.grid(True, alpha=0.3)
     
     # Add value labels on bars
-    for i, bar in enumerate(bars):
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                f'{height:.1f}%', ha='center', va='bottom')
+    ax2.bar_label(bars, fmt='%.1f%%', padding=3)
     
-    plt.tight_layout()
-    plt.savefig('tax_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'tax_analysis.png')
+    if owned:
+        show_or_close(fig)
 
-def create_state_analysis(df):
+def create_state_analysis(df, summary=None, fig=None):
     """Create state-wise analysis"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig, owned = chart_figure(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+    
+    if summary is None:
+        summary = summarize_data(df)
     
     # State distribution pie chart
-    state_counts = df['state'].value_counts()
+    state_counts = summary['state_counts']
     colors = plt.cm.Set3(np.linspace(0, 1, len(state_counts)))
     wedges, texts, autotexts = ax1.pie(state_counts.values, labels=state_counts.index, 
                                       autopct='%1.1f%%', colors=colors, startangle=90)
     ax1.set_title('Taxpayers by State')
     
     # Average wages by state
-    state_wages = df.groupby('state')['wages'].mean().sort_values(ascending=True)
+    state_wages = summary['state_wages'].sort_values(ascending=True)
     bars = ax2.barh(range(len(state_wages)), state_wages.values, color='lightgreen')
     ax2.set_yticks(range(len(state_wages)))
     ax2.set_yticklabels(state_wages.index)
@@ -124,23 +370,23 @@ def create_state_analysis(df):
     ax2.grid(True, alpha=0.3, axis='x')
     
     # Add value labels
-    for i, bar in enumerate(bars):
-        width = bar.get_width()
-        ax2.text(width + 1000, bar.get_y() + bar.get_height()/2,
-                f'${width:,.0f}', ha='left', va='center')
+    ax2.bar_label(bars, fmt=lambda width: f'${width:,.0f}', padding=3)
     
-    plt.tight_layout()
-    plt.savefig('state_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'state_analysis.png')
+    if owned:
+        show_or_close(fig)
 
-def create_processing_metrics(df):
+def create_processing_metrics(df, fig=None):
     """Create processing performance metrics"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig, owned = chart_figure(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+    
+    processing_time = df['processing_time'].to_numpy(dtype=np.float64)
+    mean_time = processing_time.mean()
     
     # Processing time distribution
-    ax1.hist(df['processing_time'], bins=6, alpha=0.7, color='orange', edgecolor='black')
-    ax1.axvline(df['processing_time'].mean(), color='red', linestyle='--', linewidth=2, 
-                label=f'Mean: {df["processing_time"].mean():.2f}s')
+    draw_histogram(ax1, processing_time, bins=6, alpha=0.7, color='orange', edgecolor='black')
+    ax1.axvline(mean_time, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean_time:.2f}s')
     ax1.set_xlabel('Processing Time (seconds)')
     ax1.set_ylabel('Number of Forms')
     ax1.set_title('Form Processing Time Distribution')
@@ -148,35 +394,41 @@ def create_processing_metrics(df):
     ax1.grid(True, alpha=0.3)
     
     # Processing efficiency timeline
-    df_sorted = df.sort_values('processing_time')
-    cumulative_time = df_sorted['processing_time'].cumsum()
-    ax2.plot(range(1, len(df_sorted)+1), cumulative_time, marker='o', linewidth=2, markersize=6)
+    # Sort and accumulate the one column rather than a copy of the frame
+    cumulative_time = np.cumsum(np.sort(processing_time))
+    n_forms = cumulative_time.size
+    plot_series(ax2, np.arange(1, n_forms + 1), cumulative_time, marker='o', linewidth=2, markersize=6)
     ax2.set_xlabel('Number of Forms Processed')
     ax2.set_ylabel('Cumulative Processing Time (seconds)')
     ax2.set_title('Cumulative Processing Performance')
     ax2.grid(True, alpha=0.3)
     
     # Add annotations
-    total_time = cumulative_time.iloc[-1]
-    avg_time = total_time / len(df_sorted)
+    total_time = cumulative_time[-1]
+    avg_time = total_time / n_forms
     ax2.text(0.7, 0.3, f'Total Time: {total_time:.1f}s\nAvg per Form: {avg_time:.2f}s', 
              transform=ax2.transAxes, bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
     
-    plt.tight_layout()
-    plt.savefig('processing_metrics.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'processing_metrics.png')
+    if owned:
+        show_or_close(fig)
 
-def create_refund_analysis(df):
+def create_refund_analysis(df, fig=None):
     """Create refund amount analysis"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    fig, owned = chart_figure(fig)
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Refund vs Wages scatter
-    ax1.scatter(df['wages'], df['refund_amount'], alpha=0.7, s=100, color='purple')
+    wages = column_array(df, 'wages')
+    refunds = column_array(df, 'refund_amount')
+    ax1.scatter(wages, refunds, alpha=0.7, s=100, color='purple')
     
-    # Add trend line
-    z = np.polyfit(df['wages'], df['refund_amount'], 1)
-    p = np.poly1d(z)
-    ax1.plot(df['wages'], p(df['wages']), "r--", alpha=0.8, linewidth=2)
+    # Add trend line: least-squares fit, drawn as a single segment
+    x = df['wages'].to_numpy(dtype=np.float64)
+    y = df['refund_amount'].to_numpy(dtype=np.float64)
+    slope, intercept = trend_line(x, y)
+    x_line = np.array([x.min(), x.max()])
+    ax1.plot(x_line, slope * x_line + intercept, "r--", alpha=0.8, linewidth=2)
     
     ax1.set_xlabel('Annual Wages ($)')
     ax1.set_ylabel('Refund Amount ($)')
@@ -184,23 +436,29 @@ def create_refund_analysis(df):
     ax1.grid(True, alpha=0.3)
     
     # Refund distribution by filing status
-    sns.violinplot(data=df, x='filing_status', y='refund_amount', ax=ax2)
+    labels, refunds_by_status = group_values(df, 'refund_amount', 'filing_status')
+    ax2.violinplot(refunds_by_status, showmeans=True)
+    ax2.set_xticks(range(1, len(labels) + 1))
+    ax2.set_xticklabels(labels)
     ax2.set_xlabel('Filing Status')
     ax2.set_ylabel('Refund Amount ($)')
     ax2.set_title('Refund Distribution by Filing Status')
     ax2.tick_params(axis='x', rotation=45)
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('refund_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'refund_analysis.png')
+    if owned:
+        show_or_close(fig)
 
-def create_comprehensive_dashboard(df):
+def create_comprehensive_dashboard(df, summary=None):
     """Create a comprehensive dashboard"""
-    fig = plt.figure(figsize=(20, 12))
+    fig = plt.figure(figsize=(20, 12), layout='constrained')
+    
+    if summary is None:
+        summary = summarize_data(df)
     
     # Create grid layout
-    gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)
+    gs = fig.add_gridspec(3, 4)
     
     # 1. Summary statistics
     ax1 = fig.add_subplot(gs[0, 0])
@@ -221,7 +479,7 @@ def create_comprehensive_dashboard(df):
     
     # 2. Wages histogram
     ax2 = fig.add_subplot(gs[0, 1:3])
-    ax2.hist(df['wages'], bins=8, alpha=0.7, color='skyblue', edgecolor='black')
+    draw_histogram(ax2, df['wages'], bins=8, alpha=0.7, color='skyblue', edgecolor='black')
     ax2.set_title('Wages Distribution')
     ax2.set_xlabel('Annual Wages ($)')
     ax2.set_ylabel('Frequency')
@@ -229,14 +487,14 @@ def create_comprehensive_dashboard(df):
     
     # 3. Filing status pie
     ax3 = fig.add_subplot(gs[0, 3])
-    filing_counts = df['filing_status'].value_counts()
+    filing_counts = summary['filing_counts']
     ax3.pie(filing_counts.values, labels=filing_counts.index, autopct='%1.0f%%', startangle=90)
     ax3.set_title('Filing Status Distribution')
     
     # 4. Tax withholding scatter
     ax4 = fig.add_subplot(gs[1, 0:2])
-    scatter = ax4.scatter(df['wages'], df['federal_tax_withheld'], 
-                         c=df['refund_amount'], cmap='viridis', s=100, alpha=0.7)
+    scatter = ax4.scatter(column_array(df, 'wages'), column_array(df, 'federal_tax_withheld'),
+                         c=column_array(df, 'refund_amount'), cmap='viridis', s=100, alpha=0.7)
     ax4.set_xlabel('Annual Wages ($)')
     ax4.set_ylabel('Federal Tax Withheld ($)')
     ax4.set_title('Tax Withholding vs Wages (colored by refund)')
@@ -245,7 +503,7 @@ def create_comprehensive_dashboard(df):
     
     # 5. State analysis
     ax5 = fig.add_subplot(gs[1, 2:4])
-    state_wages = df.groupby('state')['wages'].mean()
+    state_wages = summary['state_wages']
     bars = ax5.bar(state_wages.index, state_wages.values, color='lightgreen')
     ax5.set_title('Average Wages by State')
     ax5.set_xlabel('State')
@@ -254,7 +512,7 @@ def create_comprehensive_dashboard(df):
     
     # 6. Processing performance
     ax6 = fig.add_subplot(gs[2, 0:2])
-    ax6.plot(range(1, len(df)+1), df['processing_time'], marker='o', linewidth=2)
+    plot_series(ax6, np.arange(1, len(df) + 1), df['processing_time'], marker='o', linewidth=2)
     ax6.set_title('Processing Time per Form')
     ax6.set_xlabel('Form Number')
     ax6.set_ylabel('Processing Time (seconds)')
@@ -262,8 +520,7 @@ def create_comprehensive_dashboard(df):
     
     # 7. Tax rate analysis
     ax7 = fig.add_subplot(gs[2, 2:4])
-    df['tax_rate'] = (df['federal_tax_withheld'] / df['wages']) * 100
-    avg_rates = df.groupby('filing_status')['tax_rate'].mean()
+    avg_rates = summary['filing_tax_rate']
     bars = ax7.bar(range(len(avg_rates)), avg_rates.values, color='coral')
     ax7.set_title('Average Tax Rate by Filing Status')
     ax7.set_xlabel('Filing Status')
@@ -275,11 +532,29 @@ def create_comprehensive_dashboard(df):
     plt.suptitle('IRS Tax Form Parser - Comprehensive Data Analysis Dashboard', 
                  fontsize=16, fontweight='bold', y=0.98)
     
-    plt.savefig('comprehensive_dashboard.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    save_png(fig, 'comprehensive_dashboard.png')
+    show_or_close(fig)
+
+# Reusable two-panel figure owned by the current chart worker process
+_worker_figure = None
+
+def _init_chart_worker():
+    """Create the figure this worker process reuses for its two-panel charts"""
+    global _worker_figure
+    init_style()
+    _worker_figure = plt.figure(figsize=(15, 6), layout='constrained')
+
+def _render_chart_in_worker(create_chart, args, two_panel):
+    """Render one chart inside a worker process"""
+    if two_panel:
+        create_chart(*args, fig=_worker_figure)
+    else:
+        create_chart(*args)
 
 def main():
     """Run the complete visualization demo"""
+    init_style()
+    
     print("🎨 IRS Tax Form Parser - Data Visualization Demo")
     print("=" * 60)
     print(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -288,29 +563,39 @@ def main():
     # Create sample data
     print("📊 Creating sample tax data...")
     df = create_sample_data()
+    summary = summarize_data(df)
     print(f"✅ Generated dataset with {len(df)} tax forms")
     print()
     
     # Generate visualizations
     print("📈 Generating visualizations...")
     
-    print("1. Creating wages distribution charts...")
-    create_wages_distribution(df)
-    
-    print("2. Creating tax analysis charts...")
-    create_tax_analysis(df)
-    
-    print("3. Creating state-wise analysis...")
-    create_state_analysis(df)
-    
-    print("4. Creating processing metrics...")
-    create_processing_metrics(df)
-    
-    print("5. Creating refund analysis...")
-    create_refund_analysis(df)
-    
-    print("6. Creating comprehensive dashboard...")
-    create_comprehensive_dashboard(df)
+    # (progress message, chart function, arguments, two-panel layout)
+    charts = [
+        ("1. Creating wages distribution charts...", create_wages_distribution, (df, summary), True),
+        ("2. Creating tax analysis charts...", create_tax_analysis, (df, summary), True),
+        ("3. Creating state-wise analysis...", create_state_analysis, (df, summary), True),
+        ("4. Creating processing metrics...", create_processing_metrics, (df,), True),
+        ("5. Creating refund analysis...", create_refund_analysis, (df,), True),
+        ("6. Creating comprehensive dashboard...", create_comprehensive_dashboard, (df, summary), False),
+    ]
+    
+    if INTERACTIVE:
+        # Windows have to be shown from this process, one chart at a time
+        for message, create_chart, args, _ in charts:
+            print(message)
+            create_chart(*args)
+    else:
+        # Each chart writes its own PNG, so they render independently on a
+        # process pool; every worker reuses one figure for its two-panel charts
+        workers = max(1, min(len(charts), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_chart_worker) as executor:
+            futures = []
+            for message, create_chart, args, two_panel in charts:
+                print(message)
+                futures.append(executor.submit(_render_chart_in_worker, create_chart, args, two_panel))
+            for future in futures:
+                future.result()
     
     print("\n✅ All visualizations generated successfully!")
     print("📁 Files saved:")